@@ -1,58 +1,357 @@
 import json
-import yaml
-from openai import OpenAI
-from tools import discover_tools
+import time
+import asyncio
+from contextlib import nullcontext
+from openai.types.chat import ChatCompletion
+from runtime import get_runtime, run_sync
+from context_manager import ContextManager, message_text
+from llm_cache import CacheMissError, make_key
+from tracing import NULL_TRACER
+from usage import add_usage, empty_usage, response_usage
+
+# Sent once the orchestration budget is nearly used up
+BUDGET_WRAP_UP_PROMPT = "The token budget for this task is almost used up. Give your final answer now, based on what you have found so far."
+
+
+class StreamInterruptedError(Exception):
+    """A streamed response failed after tokens were already passed to on_token"""
+
+
+def assistant_message_dict(message) -> dict:
+    """
+    Convert an assistant message into a plain dict with a fixed field order, so the
+    conversation prefix serializes identically on every iteration (provider prompt caching).
+    """
+    entry = {"role": "assistant", "content": message.content}
+    if message.tool_calls:
+        entry["tool_calls"] = [
+            {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments}
+            }
+            for tool_call in message.tool_calls
+        ]
+    return entry
+
+
+def prompt_cache_stats(call_metrics) -> dict:
+    """Aggregate provider prompt-cache reuse over a list of call metrics"""
+    prompt_tokens = sum(m.get("prompt_tokens") or 0 for m in call_metrics)
+    cached_tokens = sum(m.get("cached_tokens") or 0 for m in call_metrics)
+    return {
+        "calls": len(call_metrics),
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "hit_ratio": cached_tokens / prompt_tokens if prompt_tokens else 0.0
+    }
+
+
+class AsyncOpenRouterAgent:
+    def __init__(self, config_path="config.yaml", silent=False, runtime=None):
+        # Shared runtime: parsed config, pooled HTTP client and tool registry
+        self.runtime = runtime or get_runtime(config_path)
+        self.config = self.runtime.config
 
-class OpenRouterAgent:
-    def __init__(self, config_path="config.yaml", silent=False):
-        # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
-        
         # Silent mode for orchestrator (suppresses debug output)
         self.silent = silent
-        
-        # Initialize OpenAI client with OpenRouter
-        self.client = OpenAI(
-            base_url=self.config['openrouter']['base_url'],
-            api_key=self.config['openrouter']['api_key']
-        )
-        
-        # Discover tools dynamically
-        self.discovered_tools = discover_tools(self.config, silent=self.silent)
-        
+
+        # Tools are discovered once per process by the runtime
+        self.discovered_tools = self.runtime.tools
+        if not self.silent:
+            for name in self.discovered_tools:
+                print(f"Loaded tool: {name}")
+
         # Build OpenRouter tools array
-        self.tools = [tool.to_openrouter_schema() for tool in self.discovered_tools.values()]
-        
+        self.tools = list(self.runtime.tool_schemas)
+
         # Build tool mapping
-        self.tool_mapping = {name: tool.execute for name, tool in self.discovered_tools.items()}
-    
-    
-    def call_llm(self, messages):
-        """Make OpenRouter API call with tools"""
+        self.tool_mapping = self.runtime.tool_mapping()
+
+        # Tool execution limits
+        agent_config = self.config.get('agent', {})
+        self.tool_deadline = agent_config.get('tool_deadline', 60)
+
+        # Streaming mode and per-call latency metrics (TTFT / inter-token latency)
+        self.stream = agent_config.get('stream', False)
+        self.call_metrics = []
+
+        # Keeps the conversation under the prompt token budget
+        self.context = ContextManager(self.config, summarizer=self._summarize_text)
+
+        # Per-run budgets and termination
+        self.max_wall_time = agent_config.get('max_wall_time')
+        self.max_prompt_tokens_total = agent_config.get('max_prompt_tokens_total')
+        self.max_completion_tokens_total = agent_config.get('max_completion_tokens_total')
+        self.stop_on_final_answer = agent_config.get('stop_on_final_answer', True)
+        self.usage = {**empty_usage(), "calls": 0}
+        self.stop_reason = None
+
+        # Orchestration-wide token/cost ledger and this agent's phase in it, and the ledger
+        # whose budget this agent's loop obeys (set by the orchestrator)
+        self.usage_ledger = None
+        self.phase = None
+        self.run_budget = None
+
+        # Span instrumentation; the orchestrator supplies a recording tracer
+        self.tracer = NULL_TRACER
+        self.iteration = 0
+
+        # Transcript of the latest run
+        self.messages = []
+
+        # Tool results shared with the other agents of an orchestration (set by the orchestrator)
+        self.tool_cache = None
+
+        # Slot gate of a batch's global LLM scheduler (set by the orchestrator)
+        self.llm_gate = None
+
+    @property
+    def client(self):
+        """Pooled OpenRouter client for the running event loop"""
+        return self.runtime.client()
+
+    def _execute_tool(self, tool_name: str, tool_args: dict):
+        """Execute a blocking tool (called in a tool_executor thread)"""
+        return self.tool_mapping[tool_name](**tool_args)
+
+    async def _execute_tool_limited(self, tool_name: str, tool_args: dict):
+        """Run a blocking tool on the shared executor once the tool's concurrency limit allows"""
+        semaphore = self.runtime.tool_semaphore(tool_name)
+        await semaphore.acquire()
         try:
-            response = self.client.chat.completions.create(
-                model=self.config['openrouter']['model'],
-                messages=messages,
-                tools=self.tools
+            future = asyncio.get_running_loop().run_in_executor(
+                self.runtime.tool_executor, self._execute_tool, tool_name, tool_args
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def finished(future):
+            # The slot is held until the tool thread is done, not just until the caller stops
+            # waiting: a call abandoned at the iteration deadline keeps running in its thread
+            semaphore.release()
+            if not future.cancelled():
+                future.exception()
+
+        future.add_done_callback(finished)
+        return await asyncio.shield(future)
+
+    async def call_llm(self, messages, on_token=None, tools=None, **params):
+        """Make OpenRouter API call with tools, streaming tokens to on_token if enabled"""
+        with self.tracer.span(
+            "llm_call",
+            model=self.config['openrouter']['model'],
+            iteration=self.iteration,
+            messages=len(messages),
+            prompt_bytes=sum(len(message_text(m)) for m in messages)
+        ) as span:
+            response = await self._call_llm(messages, on_token, tools, **params)
+            usage = response.usage
+            span.set(
+                cached_response=self.call_metrics[-1]["cached"],
+                finish_reason=response.choices[0].finish_reason,
+                prompt_tokens=usage.prompt_tokens if usage else None,
+                completion_tokens=usage.completion_tokens if usage else None,
+                cached_tokens=self.call_metrics[-1].get("cached_tokens"),
+                retries=self.call_metrics[-1].get("retries", 0),
+                queue_delay=self.call_metrics[-1].get("queue_delay", 0.0)
             )
             return response
+
+    async def _call_llm(self, messages, on_token, tools, **params):
+        """Serve an LLM request from the cache or make it through the rate limiter"""
+        request = {
+            "model": self.config['openrouter']['model'],
+            "messages": messages,
+            **params
+        }
+        tools = self.tools if tools is None else tools
+        if tools:
+            request["tools"] = tools
+
+        # Serve from the response cache when possible
+        cache = self.runtime.llm_cache
+        cache_key = make_key(request) if cache.mode != "off" else None
+        start_time = time.time()
+        try:
+            cached = await cache.get_async(cache_key) if cache.reads else None
+            if cache.mode == "replay_only" and cached is None:
+                raise CacheMissError("no recorded response for this request (replay_only mode)")
         except Exception as e:
-            raise Exception(f"LLM call failed: {str(e)}")
-    
-    def handle_tool_call(self, tool_call):
+            raise Exception(f"LLM call failed: {str(e)}") from e
+        if cached is not None:
+            response = ChatCompletion.construct(**cached)
+            content = response.choices[0].message.content
+            if on_token and content:
+                on_token(content)
+            duration = time.time() - start_time
+            self.call_metrics.append({"streamed": False, "cached": True, "ttft": duration, "inter_token_latency": None, "duration": duration})
+            return response
+
+        async def attempt():
+            attempt_start = time.time()
+            if self.stream:
+                return await self._stream_completion(request, on_token, attempt_start)
+            response = await self.client.chat.completions.create(**request)
+            duration = time.time() - attempt_start
+            return response, {"streamed": False, "cached": False, "ttft": duration, "inter_token_latency": None, "duration": duration}
+
+        # Live call through the shared rate limiter, retrying transient errors. In a batch the
+        # call first needs a slot of the global scheduler, so waiting calls queue there by priority
+        try:
+            async with self.llm_gate.slot() if self.llm_gate is not None else nullcontext(0.0) as scheduler_wait:
+                (response, metrics), limiter_stats = await self.runtime.rate_limiter.call(
+                    attempt,
+                    estimated_tokens=self.context.count_tokens(messages),
+                    actual_tokens=lambda result: result[0].usage.total_tokens if result[0].usage else None
+                )
+        except Exception as e:
+            raise Exception(f"LLM call failed: {str(e)}") from e
+        metrics["scheduler_wait"] = scheduler_wait
+        metrics.update(limiter_stats)
+
+        if cache.writes:
+            await cache.put_async(cache_key, response.to_dict())
+
+        usage = response_usage(response, self.config['openrouter'].get('pricing'))
+        metrics.update(usage or {"prompt_tokens": None, "cached_tokens": None})
+        if usage:
+            add_usage(self.usage, usage)
+            self.usage["calls"] += 1
+            if self.usage_ledger is not None:
+                self.usage_ledger.add(self.phase, usage)
+        self.call_metrics.append(metrics)
+        return response
+
+    async def _stream_completion(self, request, on_token, start_time):
+        """Stream a completion, assembling content and tool-call deltas into a ChatCompletion"""
+        stream = await self.client.chat.completions.create(
+            **request,
+            stream=True,
+            stream_options={"include_usage": True}
+        )
+
+        content_parts = []
+        tool_calls = {}
+        finish_reason = None
+        usage = None
+        response_id, created, model = None, int(start_time), request["model"]
+        token_times = []
+
+        try:
+            async for chunk in stream:
+                response_id = chunk.id or response_id
+                created = chunk.created or created
+                model = chunk.model or model
+                if chunk.usage:
+                    usage = chunk.usage.to_dict()
+                if not chunk.choices:
+                    continue
+
+                choice = chunk.choices[0]
+                delta = choice.delta
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+
+                if delta.content:
+                    token_times.append(time.time())
+                    content_parts.append(delta.content)
+                    if on_token:
+                        on_token(delta.content)
+
+                # Tool call arguments arrive in fragments keyed by index
+                for tool_delta in delta.tool_calls or []:
+                    token_times.append(time.time())
+                    entry = tool_calls.setdefault(tool_delta.index, {
+                        "id": None,
+                        "type": "function",
+                        "function": {"name": "", "arguments": ""}
+                    })
+                    if tool_delta.id:
+                        entry["id"] = tool_delta.id
+                    if tool_delta.function:
+                        entry["function"]["name"] += tool_delta.function.name or ""
+                        entry["function"]["arguments"] += tool_delta.function.arguments or ""
+        except Exception as e:
+            if on_token and content_parts:
+                # Tokens were already delivered, so retrying would repeat them
+                raise StreamInterruptedError(f"stream interrupted after {len(content_parts)} tokens: {e}") from e
+            raise
+
+        end_time = time.time()
+        gaps = [later - earlier for earlier, later in zip(token_times, token_times[1:])]
+        metrics = {
+            "streamed": True,
+            "cached": False,
+            "ttft": (token_times[0] if token_times else end_time) - start_time,
+            "inter_token_latency": sum(gaps) / len(gaps) if gaps else None,
+            "duration": end_time - start_time
+        }
+
+        response = ChatCompletion.construct(
+            id=response_id,
+            object="chat.completion",
+            created=created,
+            model=model,
+            choices=[{
+                "index": 0,
+                "finish_reason": finish_reason or "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": "".join(content_parts) or None,
+                    "tool_calls": [tool_calls[index] for index in sorted(tool_calls)] or None
+                }
+            }],
+            usage=usage
+        )
+        return response, metrics
+
+    async def complete(self, prompt: str, on_token=None, **params) -> str:
+        """Single tool-free round trip: send one user message and return the reply content"""
+        response = await self.call_llm([{"role": "user", "content": prompt}], on_token=on_token, tools=[], **params)
+        self.stop_reason = response.choices[0].finish_reason
+        return response.choices[0].message.content or ""
+
+    async def _summarize_text(self, prompt: str) -> str:
+        """Tool-free LLM call used by the context manager to summarize older turns"""
+        response = await self.call_llm([{"role": "user", "content": prompt}], tools=[])
+        return response.choices[0].message.content
+
+    async def handle_tool_call(self, tool_call):
         """Handle a tool call and return the result message"""
+        with self.tracer.span(
+            "tool_call",
+            tool=tool_call.function.name,
+            iteration=self.iteration,
+            args_bytes=len(tool_call.function.arguments or "")
+        ) as span:
+            result = await self._run_tool_call(tool_call)
+            span.set(result_bytes=len(result["content"]))
+            return result
+
+    async def _run_tool_call(self, tool_call):
+        """Execute a tool call and build its tool message"""
+        tool_name = tool_call.function.name
         try:
-            # Extract tool name and arguments
-            tool_name = tool_call.function.name
+            # Extract tool arguments
             tool_args = json.loads(tool_call.function.arguments)
-            
-            # Call appropriate tool from tool_mapping
-            if tool_name in self.tool_mapping:
-                tool_result = self.tool_mapping[tool_name](**tool_args)
+
+            # Call appropriate tool from tool_mapping; tools are blocking, so run them off the loop
+            if tool_name in self.tool_mapping and self.tool_cache is not None and self.tool_cache.cacheable(tool_name):
+                # Identical read-only calls of other agents in this run share one execution
+                loop = asyncio.get_running_loop()
+                future = self.tool_cache.submit(
+                    tool_name, tool_args,
+                    lambda: asyncio.run_coroutine_threadsafe(self._execute_tool_limited(tool_name, tool_args), loop)
+                )
+                # Shielded so a timed-out caller does not cancel the execution others wait on
+                tool_result = await asyncio.shield(asyncio.wrap_future(future))
+            elif tool_name in self.tool_mapping:
+                tool_result = await self._execute_tool_limited(tool_name, tool_args)
             else:
                 tool_result = {"error": f"Unknown tool: {tool_name}"}
-            
+
             # Return tool result message
             return {
                 "role": "tool",
@@ -60,7 +359,7 @@ class OpenRouterAgent:
                 "name": tool_name,
                 "content": json.dumps(tool_result)
             }
-        
+
         except Exception as e:
             return {
                 "role": "tool",
@@ -68,9 +367,33 @@ class OpenRouterAgent:
                 "name": tool_name,
                 "content": json.dumps({"error": f"Tool execution failed: {str(e)}"})
             }
-    
-    def run(self, user_input: str):
-        """Run the agent with user input and return FULL conversation content"""
+
+    async def handle_tool_calls(self, tool_calls, timeout=None):
+        """Run all tool calls of one assistant turn concurrently, returning results in call order"""
+        timeout = self.tool_deadline if timeout is None else timeout
+        tasks = [asyncio.ensure_future(self.handle_tool_call(tool_call)) for tool_call in tool_calls]
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+        results = []
+        for tool_call, task in zip(tool_calls, tasks):
+            if task in done:
+                results.append(task.result())
+            else:
+                results.append({
+                    "role": "tool",
+                    "tool_call_id": tool_call.id,
+                    "name": tool_call.function.name,
+                    "content": json.dumps({"error": f"Tool execution exceeded the {timeout:.0f}s iteration deadline"})
+                })
+        return results
+
+    async def run(self, user_input: str, on_token=None):
+        """Run the agent with user input and return FULL conversation content.
+
+        If streaming is enabled, on_token is called with each content token as it arrives.
+        """
         # Initialize messages with system prompt and user input
         messages = [
             {
@@ -82,62 +405,151 @@ class OpenRouterAgent:
                 "content": user_input
             }
         ]
-        
+        self.messages = messages
+
         # Track all assistant responses for full content capture
         full_response_content = []
-        
+
+        # Per-run budgets; the loop stops early and returns its best content when one runs out
+        self.stop_reason = None
+        self.usage = {**empty_usage(), "calls": 0}
+        deadline = time.time() + self.max_wall_time if self.max_wall_time else None
+
         # Implement agentic loop from OpenRouter docs
         max_iterations = self.config.get('agent', {}).get('max_iterations', 10)
         iteration = 0
-        
+
         while iteration < max_iterations:
+            self.stop_reason = self._budget_exhausted()
+            if self.stop_reason:
+                break
+
             iteration += 1
+            self.iteration = iteration
             if not self.silent:
                 print(f"🔄 Agent iteration {iteration}/{max_iterations}")
-            
-            # Call LLM
-            response = self.call_llm(messages)
-            
+
+            # Orchestration budget nearly used up: ask for the answer now, without more tool calls
+            wrap_up = self.run_budget is not None and self.run_budget.degraded()
+            if wrap_up:
+                messages.append({"role": "user", "content": BUDGET_WRAP_UP_PROMPT})
+
+            # Keep the prompt within the token budget, then call LLM before the deadline
+            try:
+                messages, response = await asyncio.wait_for(
+                    self._step(messages, on_token, **({"tool_choice": "none"} if wrap_up else {})),
+                    timeout=max(deadline - time.time(), 0) if deadline else None
+                )
+            except asyncio.TimeoutError:
+                self.stop_reason = "deadline"
+                break
+
             # Add the response to messages
-            assistant_message = response.choices[0].message
-            messages.append({
-                "role": "assistant",
-                "content": assistant_message.content,
-                "tool_calls": assistant_message.tool_calls
-            })
-            
+            choice = response.choices[0]
+            assistant_message = choice.message
+            messages.append(assistant_message_dict(assistant_message))
+            self.messages = messages  # Context fitting may have replaced the list
+
             # Capture assistant content for full response
             if assistant_message.content:
                 full_response_content.append(assistant_message.content)
-            
+
+            if wrap_up:
+                self.stop_reason = "budget_degraded"
+                break
+
             # Check if there are tool calls
             if assistant_message.tool_calls:
                 if not self.silent:
                     print(f"🔧 Agent making {len(assistant_message.tool_calls)} tool call(s)")
-                # Handle each tool call
-                task_completed = False
-                for tool_call in assistant_message.tool_calls:
-                    if not self.silent:
+                    for tool_call in assistant_message.tool_calls:
                         print(f"   📞 Calling tool: {tool_call.function.name}")
-                    tool_result = self.handle_tool_call(tool_call)
-                    messages.append(tool_result)
-                    
-                    # Check if this was the task completion tool
-                    if tool_call.function.name == "mark_task_complete":
-                        task_completed = True
-                        if not self.silent:
-                            print("✅ Task completion tool called - exiting loop")
-                        # Return FULL conversation content, not just completion message
-                        return "\n\n".join(full_response_content)
-                
-                # If task was completed, we already returned above
-                if task_completed:
+
+                # Handle all tool calls concurrently; results keep the original call order
+                timeout = self.tool_deadline
+                if deadline:
+                    timeout = max(min(timeout, deadline - time.time()), 0)
+                tool_results = await self.handle_tool_calls(assistant_message.tool_calls, timeout=timeout)
+                messages.extend(tool_results)
+
+                # Check if the task completion tool was called
+                if any(tool_call.function.name == "mark_task_complete" for tool_call in assistant_message.tool_calls):
+                    if not self.silent:
+                        print("✅ Task completion tool called - exiting loop")
+                    self.stop_reason = "task_complete"
+                    # Return FULL conversation content, not just completion message
                     return "\n\n".join(full_response_content)
+            elif self.stop_on_final_answer and choice.finish_reason == "stop" and assistant_message.content:
+                # A complete answer without tool calls is final; another call would only repeat it
+                if not self.silent:
+                    print("✅ Agent gave a final answer - exiting loop")
+                self.stop_reason = "final_answer"
+                return "\n\n".join(full_response_content)
+            elif choice.finish_reason == "length":
+                # Output was cut off by the provider; ask the model to carry on
+                messages.append({"role": "user", "content": "Continue exactly where you left off."})
+            elif self.stop_on_final_answer and choice.finish_reason not in (None, "stop", "tool_calls"):
+                # content_filter, error, ...: retrying the same prompt will not help
+                self.stop_reason = choice.finish_reason
+                break
             else:
                 if not self.silent:
                     print("💭 Agent responded without tool calls - continuing loop")
-            
-            # Continue the loop regardless of whether there were tool calls or not
-        
-        # If max iterations reached, return whatever content we gathered
-        return "\n\n".join(full_response_content) if full_response_content else "Maximum iterations reached. The agent may be stuck in a loop."
\ No newline at end of file
+
+        if self.stop_reason is None:
+            self.stop_reason = "max_iterations"
+        if not self.silent and self.stop_reason != "max_iterations":
+            print(f"⏹️ Agent stopped early: {self.stop_reason}")
+
+        # Return whatever content we gathered
+        if full_response_content:
+            return "\n\n".join(full_response_content)
+        if self.stop_reason == "max_iterations":
+            return "Maximum iterations reached. The agent may be stuck in a loop."
+        return f"Agent stopped ({self.stop_reason}) before producing an answer."
+
+    async def _step(self, messages, on_token, **params):
+        """Fit the conversation to the context budget and make one LLM call"""
+        messages = await self.context.fit(messages)
+        response = await self.call_llm(messages, on_token=on_token, **params)
+        return messages, response
+
+    def _budget_exhausted(self):
+        """Return the stop reason if a per-run token budget has been used up"""
+        if self.max_prompt_tokens_total and self.usage["prompt_tokens"] >= self.max_prompt_tokens_total:
+            return "token_budget"
+        if self.max_completion_tokens_total and self.usage["completion_tokens"] >= self.max_completion_tokens_total:
+            return "token_budget"
+        if self.run_budget is not None and self.run_budget.exhausted():
+            return "run_budget"
+        return None
+
+
+class OpenRouterAgent:
+    """Synchronous wrapper around AsyncOpenRouterAgent"""
+
+    def __init__(self, config_path="config.yaml", silent=False, runtime=None):
+        self.agent = AsyncOpenRouterAgent(config_path=config_path, silent=silent, runtime=runtime)
+
+    def __getattr__(self, name):
+        # Expose config, tools, tool_mapping etc. of the wrapped agent
+        return getattr(self.agent, name)
+
+    def call_llm(self, messages, on_token=None):
+        """Make OpenRouter API call with tools"""
+        return run_sync(self.agent.call_llm(messages, on_token=on_token))
+
+    def handle_tool_call(self, tool_call):
+        """Handle a tool call and return the result message"""
+        return run_sync(self.agent.handle_tool_call(tool_call))
+
+    def run(self, user_input: str, on_token=None):
+        """Run the agent with user input and return FULL conversation content.
+
+        on_token is called from the background event loop thread as tokens stream in.
+        """
+        return run_sync(self.agent.run(user_input, on_token=on_token))
+
+    def complete(self, prompt: str, on_token=None, **params):
+        """Single tool-free round trip returning the reply content"""
+        return run_sync(self.agent.complete(prompt, on_token=on_token, **params))
@@ -0,0 +1,212 @@
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+# Backends that run agents in the orchestrator's own process and event loop
+IN_PROCESS = "thread"
+
+
+def agent_summary(agent, response: str, execution_time: float) -> Dict[str, Any]:
+    """Picklable / JSON-serializable outcome of one agent run"""
+    return {
+        "response": response,
+        "execution_time": execution_time,
+        "stop_reason": agent.stop_reason,
+        "usage": dict(agent.usage),
+        "call_metrics": agent.call_metrics,
+        "context_stats": agent.context.stats,
+        "transcript": agent.messages
+    }
+
+
+async def run_agent_standalone(config_path: str, subtask: str) -> Dict[str, Any]:
+    """Run one agent to completion in the current process"""
+    from agent import AsyncOpenRouterAgent
+    agent = AsyncOpenRouterAgent(config_path=config_path, silent=True)
+    start_time = time.time()
+    response = await agent.run(subtask)
+    return agent_summary(agent, response, time.time() - start_time)
+
+
+def run_agent_job(config_path: str, subtask: str) -> Dict[str, Any]:
+    """
+    Process-pool entry point: run one agent on the worker's long-lived background loop,
+    so its agents share one pooled client, tool semaphores and rate limiter state
+    """
+    from runtime import run_sync
+    return run_sync(run_agent_standalone(config_path, subtask))
+
+
+def init_worker_process(config_path: str, workers: int):
+    """
+    Set up a worker process's runtime: its rate limiter gets a 1/workers share of the
+    configured limits, so all workers together stay within them
+    """
+    from runtime import get_runtime
+    get_runtime(config_path).rate_limiter.split(workers)
+
+
+class ProcessBackend:
+    """Agents run in a pool of worker processes, each with its own runtime and GIL"""
+
+    def __init__(self, config_path: str, workers: int):
+        self.config_path = config_path
+        # spawn: worker processes must not inherit the parent's event-loop and pool threads
+        self.pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker_process,
+            initargs=(config_path, workers)
+        )
+
+    async def run_agent(self, agent_id: int, subtask: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, run_agent_job, self.config_path, subtask)
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+class TaskQueue:
+    """
+    Minimal durable job queue in SQLite for worker processes on this machine.
+
+    SQLite's file locking is not reliable over network filesystems, so the queue file
+    must live on a local disk; spreading workers across machines needs a real broker.
+    Claims are leased, so jobs of a worker that died are handed out again after
+    lease_seconds.
+    """
+
+    def __init__(self, path: str, lease_seconds: float = 600):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, payload TEXT, status TEXT, result TEXT, worker TEXT, "
+                "created_at REAL, claimed_at REAL, finished_at REAL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; autocommit with explicit transactions for claims
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, payload, status, created_at) VALUES (?, ?, 'queued', ?)",
+            (job_id, json.dumps(payload), time.time())
+        )
+        return job_id
+
+    def claim(self, worker: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Atomically take the oldest queued (or lease-expired) job"""
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, payload FROM jobs WHERE status = 'queued' "
+                "OR (status = 'running' AND claimed_at < ?) ORDER BY created_at LIMIT 1",
+                (now - self.lease_seconds,)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE jobs SET status = 'running', worker = ?, claimed_at = ? WHERE id = ?",
+                             (worker, now, row[0]))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return (row[0], json.loads(row[1])) if row else None
+
+    def finish(self, job_id: str, result: Dict[str, Any], failed: bool = False):
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, finished_at = ? WHERE id = ?",
+            ("failed" if failed else "done", json.dumps(result, default=str), time.time(), job_id)
+        )
+
+    def take_result(self, job_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(status, result) once the job is done or failed, else None; a returned job is deleted"""
+        conn = self._connect()
+        row = conn.execute("SELECT status, result FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or row[0] not in ("done", "failed"):
+            return None
+        conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return row[0], json.loads(row[1])
+
+    def cancel(self, job_id: str):
+        """Drop a job; a worker still running it finishes without a row to write to"""
+        self._connect().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+
+class QueueBackend:
+    """
+    Agents run as jobs on a TaskQueue, executed by `python worker.py` processes on this
+    machine. spawn_workers starts that many workers for convenience.
+    """
+
+    def __init__(self, config_path: str, queue_path: str, poll_interval: float = 0.2,
+                 spawn_workers: int = 0, lease_seconds: float = 600):
+        self.queue = TaskQueue(queue_path, lease_seconds)
+        self.poll_interval = poll_interval
+        self.workers = [
+            subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "worker.py"),
+                              queue_path, config_path])
+            for _ in range(spawn_workers)
+        ]
+
+    async def run_agent(self, agent_id: int, subtask: str) -> Dict[str, Any]:
+        # SQLite calls can wait up to the busy timeout on a worker's lock; keep them off the loop
+        loop = asyncio.get_running_loop()
+        job_id = await loop.run_in_executor(None, self.queue.submit, {"agent_id": agent_id, "subtask": subtask})
+        try:
+            while True:
+                outcome = await loop.run_in_executor(None, self.queue.take_result, job_id)
+                if outcome is not None:
+                    status, result = outcome
+                    if status == "failed":
+                        raise Exception(result.get("error", "Worker failed"))
+                    return result
+                await asyncio.sleep(self.poll_interval)
+        except asyncio.CancelledError:
+            loop.run_in_executor(None, self.queue.cancel, job_id)
+            raise
+
+    def shutdown(self):
+        for worker in self.workers:
+            worker.terminate()
+
+
+def create_backend(config: dict, config_path: str):
+    """Build the configured execution backend; None means agents run in-process"""
+    backend_config = config.get('backend', {})
+    kind = backend_config.get('type', IN_PROCESS)
+    if kind == IN_PROCESS:
+        return None
+    if kind == "process":
+        return ProcessBackend(config_path, backend_config.get('workers') or os.cpu_count() or 1)
+    if kind == "queue":
+        return QueueBackend(
+            config_path,
+            backend_config.get('queue_path', '.cache/agent_queue.sqlite'),
+            poll_interval=backend_config.get('poll_interval', 0.2),
+            spawn_workers=backend_config.get('spawn_workers', 0),
+            lease_seconds=backend_config.get('lease_seconds', 600)
+        )
+    raise ValueError(f"Unknown execution backend: {kind}")
@@ -0,0 +1,117 @@
+import sys
+import json
+import time
+import asyncio
+import contextvars
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+from runtime import get_runtime, run_sync
+from orchestrator import TaskOrchestrator
+from scheduler import FairScheduler
+
+
+class BatchOrchestrator:
+    """
+    Runs many queries on one shared runtime.
+
+    Every decomposition, agent and synthesis LLM call of every query goes through one
+    FairScheduler, which caps in-flight LLM calls globally and shares them fairly
+    between queries by priority. Tools run on the runtime's shared bounded pool.
+    Queries are admitted highest priority first, up to max_concurrent_queries at a
+    time, and each result is yielded as soon as its query completes.
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        self.config_path = config_path
+        self.runtime = get_runtime(config_path)
+        batch_config = self.runtime.config.get('batch', {})
+        self.max_concurrent_queries = batch_config.get('max_concurrent_queries', 16)
+        self.scheduler = FairScheduler(
+            batch_config.get('max_in_flight_llm_calls', 32),
+            capacity=lambda: self.runtime.rate_limiter.concurrency_limit
+        )
+
+    @staticmethod
+    def normalize_queries(queries: List[Union[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Accept plain strings or dicts with query, optional id and priority (higher runs first)"""
+        normalized = []
+        for index, item in enumerate(queries):
+            if isinstance(item, str):
+                item = {"query": item}
+            normalized.append({
+                "id": item.get("id", index),
+                "query": item["query"],
+                "priority": item.get("priority", 0)
+            })
+        return normalized
+
+    async def _run_query(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        """Orchestrate one query with its LLM calls gated by the global scheduler"""
+        orchestrator = TaskOrchestrator(config_path=self.config_path, silent=True)
+        orchestrator.llm_gate = self.scheduler.for_query(item["id"], item["priority"])
+        start_time = time.time()
+        try:
+            result = await orchestrator.orchestrate_async(item["query"])
+            status = "success"
+        except Exception as e:
+            result = f"Orchestration failed: {str(e)}"
+            status = "error"
+        return {
+            **item,
+            "status": status,
+            "result": result,
+            "duration": time.time() - start_time,
+            "run_stats": orchestrator.run_stats
+        }
+
+    async def run_async(self, queries: List[Union[str, Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield each query's result as soon as it completes"""
+        backlog = sorted(self.normalize_queries(queries), key=lambda item: -item["priority"])
+        running = set()
+        while backlog or running:
+            while backlog and len(running) < self.max_concurrent_queries:
+                # Each query gets its own context so tracing spans do not leak between queries
+                item = backlog.pop(0)
+                running.add(contextvars.copy_context().run(asyncio.ensure_future, self._run_query(item)))
+            done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+
+    def run(self, queries: List[Union[str, Dict[str, Any]]],
+            on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Run a batch synchronously and return results in completion order.
+        on_result is called from the background event loop thread as each query completes.
+        """
+        async def collect():
+            results = []
+            async for result in self.run_async(queries):
+                if on_result:
+                    on_result(result)
+                results.append(result)
+            return results
+        return run_sync(collect())
+
+
+def main():
+    """Run queries from a file (one per line, or JSON lines with query/id/priority) and print JSON lines"""
+    if len(sys.argv) < 2:
+        print("Usage: python batch.py <queries file> [config.yaml]")
+        sys.exit(1)
+
+    queries = []
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                queries.append(json.loads(line) if line.startswith("{") else line)
+
+    batch = BatchOrchestrator(config_path=sys.argv[2] if len(sys.argv) > 2 else "config.yaml")
+
+    def print_result(result):
+        print(json.dumps({key: result[key] for key in ("id", "status", "duration", "result")}), flush=True)
+
+    batch.run(queries, on_result=print_result)
+
+
+if __name__ == "__main__":
+    main()
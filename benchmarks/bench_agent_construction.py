@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: cost of constructing an agent with and without the shared runtime.
+
+The "standalone" path repeats what every agent used to do on construction: parse
+config.yaml, build a new OpenAI client with its own connection pool, rediscover
+the tools and rebuild their schemas. The "shared runtime" path builds agents as
+views over one AgentRuntime.
+
+Usage: python benchmarks/bench_agent_construction.py [--iterations N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Run from the repository root so config.yaml and tools/ resolve
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import yaml
+from openai import AsyncOpenAI
+from tools import discover_tools
+from agent import AsyncOpenRouterAgent
+from runtime import AgentRuntime
+
+
+def build_standalone(config_path: str):
+    """Replicate the per-agent setup done before the shared runtime existed"""
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    client = AsyncOpenAI(
+        base_url=config['openrouter']['base_url'],
+        api_key=config['openrouter']['api_key']
+    )
+    discovered_tools = discover_tools(config, silent=True)
+    tools = [tool.to_openrouter_schema() for tool in discovered_tools.values()]
+    tool_mapping = {name: tool.execute for name, tool in discovered_tools.items()}
+    return client, tools, tool_mapping
+
+
+def measure(label: str, build, iterations: int) -> float:
+    """Time `iterations` constructions and print the per-agent cost"""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build()
+    per_agent = (time.perf_counter() - start) / iterations
+    print(f"{label:<20} {per_agent * 1e6:>12.1f} µs/agent")
+    return per_agent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--config", default="config.yaml")
+    args = parser.parse_args()
+
+    # Warm up imports so only construction cost is measured
+    build_standalone(args.config)
+    runtime = AgentRuntime(args.config)
+
+    standalone = measure("standalone", lambda: build_standalone(args.config), args.iterations)
+    shared = measure("shared runtime", lambda: AsyncOpenRouterAgent(silent=True, runtime=runtime), args.iterations)
+    print(f"speedup: {standalone / shared:.1f}x per agent "
+          f"({(standalone - shared) * 10 * 1e3:.2f} ms saved per 10-agent heavy query)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark of the agent execution backends: thread, process and queue.
+
+Real agents (AsyncOpenRouterAgent, run through TaskOrchestrator.run_agent_async and
+the configured backend) talk to a local stub of the OpenAI chat completions API that
+runs in its own process. Each agent makes --turns tool-calling turns whose replies
+carry --reply-kb KB of text, then calls mark_task_complete, so the agent side does
+what it does between real LLM calls: response parsing, token counting and context
+checks over a growing conversation, request encoding and tool execution. There is no
+network latency, so throughput is bound by the agents' CPU work.
+
+The thread backend runs every agent as a coroutine in this process (one GIL); the
+process backend uses a spawn pool of --workers processes; the queue backend spawns
+that many `worker.py` processes on a temporary SQLite queue. A pool process runs one
+agent at a time, while each queue worker runs backend.worker_concurrency agents at
+once. Pool and worker start-up is excluded by a warm-up round.
+
+Usage: python benchmarks/bench_backends.py [--units N] [--workers 1,2,4] [--turns N] [--reply-kb N]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+from orchestrator import TaskOrchestrator
+
+
+def stub_replies(turns: int, reply_kb: int):
+    """Chat completion bodies by turn: tool-calling turns with bulky text, then task completion"""
+    text = " ".join(f"Finding {i} about the topic with supporting detail." for i in range(reply_kb * 20))
+    replies = []
+    for turn in range(turns + 1):
+        if turn < turns:
+            content, name, arguments = text, "calculate", {"expression": f"{turn} * 7 + 3"}
+        else:
+            content, name, arguments = "Done.", "mark_task_complete", {"task_summary": "done", "completion_message": "ok"}
+        replies.append(json.dumps({
+            "id": f"stub-{turn}", "object": "chat.completion", "created": 0, "model": "stub",
+            "choices": [{"index": 0, "finish_reason": "tool_calls", "message": {
+                "role": "assistant", "content": content,
+                "tool_calls": [{"id": f"call_{turn}", "type": "function",
+                                "function": {"name": name, "arguments": json.dumps(arguments)}}]
+            }}],
+            "usage": {"prompt_tokens": 1000 * (turn + 1), "completion_tokens": len(content) // 4,
+                      "total_tokens": 1000 * (turn + 1) + len(content) // 4}
+        }).encode("utf-8"))
+    return replies
+
+
+def serve_stub(port_queue, turns: int, reply_kb: int):
+    """Stub API server process: answers by the number of assistant turns in the request"""
+    replies = stub_replies(turns, reply_kb)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            turn = sum(1 for message in request["messages"] if message["role"] == "assistant")
+            body = replies[min(turn, len(replies) - 1)]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def write_config(directory: str, port: int, backend: str, workers: int, turns: int) -> str:
+    """Repo config pointed at the stub, with caching, checkpoints and rate limits out of the way"""
+    with open(os.path.join(ROOT, "config.yaml"), "r", encoding="utf-8") as f:
+        config = yaml.safe_load(f)
+    config["openrouter"]["base_url"] = f"http://127.0.0.1:{port}/v1"
+    config["agent"].update(stream=False, max_iterations=turns + 2)
+    config["llm_cache"]["mode"] = "off"
+    config["checkpoint"]["enabled"] = False
+    config["tracing"]["enabled"] = False
+    config["rate_limit"].update(requests_per_minute=10 ** 7, tokens_per_minute=10 ** 10,
+                                initial_concurrency=4096, max_concurrency=4096)
+    config["backend"].update(type=backend, workers=workers, spawn_workers=workers, poll_interval=0.02,
+                             queue_path=os.path.join(directory, f"queue_{workers}.sqlite"))
+    path = os.path.join(directory, f"config_{backend}_{workers}.yaml")
+    with open(path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(config, f)
+    return path
+
+
+async def run_agents(orchestrator: TaskOrchestrator, count: int):
+    results = await asyncio.gather(*(orchestrator.run_agent_async(i, f"Research task {i}") for i in range(count)))
+    failed = [result["response"] for result in results if result["status"] != "success"]
+    if failed:
+        raise RuntimeError(f"{len(failed)} agents failed, e.g. {failed[0]}")
+
+
+def measure(config_path: str, units: int, warmup: int) -> float:
+    """Agents per second through the config's backend (start-up excluded)"""
+    orchestrator = TaskOrchestrator(config_path=config_path, silent=True)
+    try:
+        asyncio.run(run_agents(orchestrator, warmup))
+        start = time.perf_counter()
+        asyncio.run(run_agents(orchestrator, units))
+        return units / (time.perf_counter() - start)
+    finally:
+        if orchestrator.backend is not None:
+            orchestrator.backend.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--units", type=int, default=64, help="Agents per measurement")
+    parser.add_argument("--workers", default=None, help="Comma-separated worker counts (default: powers of two up to the CPU count)")
+    parser.add_argument("--turns", type=int, default=4, help="Tool-calling turns per agent")
+    parser.add_argument("--reply-kb", type=int, default=16, help="Text per model reply")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    if args.workers:
+        worker_counts = [int(count) for count in args.workers.split(",")]
+    else:
+        worker_counts = [1]
+        while worker_counts[-1] * 2 <= cpus:
+            worker_counts.append(worker_counts[-1] * 2)
+
+    context = multiprocessing.get_context("spawn")
+    port_queue = context.Queue()
+    stub = context.Process(target=serve_stub, args=(port_queue, args.turns, args.reply_kb), daemon=True)
+    stub.start()
+    port = port_queue.get(timeout=30)
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"{cpus} CPUs, {args.units} agents of {args.turns} turns x {args.reply_kb} KB replies")
+            # The thread backend has no workers: every agent is a coroutine on one event loop
+            threads = measure(write_config(directory, port, "thread", 0, args.turns), args.units, 4)
+            print(f"{'workers':>8} {'thread agents/s':>16} {'process agents/s':>17} {'queue agents/s':>15} "
+                  f"{'process speedup':>16} {'queue speedup':>14}")
+            for workers in worker_counts:
+                processes = measure(write_config(directory, port, "process", workers, args.turns),
+                                    args.units, workers)
+                queue = measure(write_config(directory, port, "queue", workers, args.turns),
+                                args.units, workers * 4)  # worker_concurrency agents per worker
+                print(f"{workers:>8} {threads:>16.1f} {processes:>17.1f} {queue:>15.1f} "
+                      f"{processes / threads:>15.2f}x {queue / threads:>13.2f}x")
+    finally:
+        stub.terminate()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
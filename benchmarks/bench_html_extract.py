@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+HTML-to-text extraction benchmark for the search tool's extractors.
+
+Each page of the corpus is extracted by every available extractor twice: once whole
+(full parse) and once the way SearchTool reads pages, in 16 KB chunks stopping as soon
+as --chars of text are extracted (the bs4 extractor cannot stop early). Extracted text
+is checked against the bs4 reference.
+
+The corpus is every *.html / *.htm file under --corpus (save some real result pages
+with e.g. `curl -o page1.html <url>`); without one, synthetic article pages are used.
+
+Usage: python benchmarks/bench_html_extract.py [--corpus DIR] [--repeat N] [--chars N]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from tools._html_extract import EXTRACTORS
+
+CHUNK_SIZE = 16384
+
+
+def synthetic_corpus():
+    """Article-like pages from 20 KB to 2 MB with scripts, styles and navigation"""
+    pages = []
+    for paragraphs in (50, 400, 3000, 12000):
+        scripts = "".join(f"<script>var data{i} = {{'k': '{'x' * 200}'}};</script>" for i in range(paragraphs // 20))
+        body = "".join(
+            f"<div class='c'><h2>Section {i}</h2><p>Paragraph {i} with <a href='/l{i}'>a link</a> "
+            f"and <b>some</b> <i>inline</i> markup &amp; entities about topic {i % 17}.</p></div>"
+            for i in range(paragraphs)
+        )
+        pages.append(f"<html><head>{scripts}<style>p {{ color: red }}</style></head>"
+                     f"<body><nav>menu</nav>{body}</body></html>")
+    return pages
+
+
+def load_corpus(directory: str):
+    pages = []
+    for root, _, filenames in os.walk(directory):
+        for filename in sorted(filenames):
+            if filename.endswith((".html", ".htm")):
+                with open(os.path.join(root, filename), "r", encoding="utf-8", errors="replace") as f:
+                    pages.append(f.read())
+    return pages
+
+
+def extract(extractor_class, page: str, chars: int = None) -> str:
+    """Feed a page in network-sized chunks, stopping early once `chars` of text are out"""
+    extractor = extractor_class()
+    for start in range(0, len(page), CHUNK_SIZE):
+        extractor.feed(page[start:start + CHUNK_SIZE])
+        if chars and extractor.streaming and len(extractor.text) >= chars:
+            break
+    extractor.close()
+    return extractor.text
+
+
+def measure(extractor_class, pages, repeat: int, chars: int = None) -> float:
+    """Seconds to extract the whole corpus once (best of `repeat`)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for page in pages:
+            extract(extractor_class, page, chars)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--corpus", default=None, help="Directory of saved HTML pages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chars", type=int, default=1000, help="Text needed per page in early-stop mode")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.corpus) if args.corpus else synthetic_corpus()
+    if not pages:
+        print(f"No HTML files found under {args.corpus}")
+        return 1
+    total_mb = sum(len(page.encode("utf-8")) for page in pages) / 1e6
+    print(f"{len(pages)} pages, {total_mb:.1f} MB{'' if args.corpus else ' (synthetic)'}")
+
+    extractors = {}
+    for name, extractor_class in EXTRACTORS.items():
+        try:
+            extractor_class()
+            extractors[name] = extractor_class
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+
+    reference = [extract(EXTRACTORS["bs4"], page) for page in pages] if "bs4" in extractors else None
+    timings = {name: (measure(extractor_class, pages, args.repeat), measure(extractor_class, pages, args.repeat, args.chars))
+               for name, extractor_class in extractors.items()}
+    baseline = timings.get("bs4", (None,))[0]
+
+    # Speedup: early-stop extraction vs the original whole-page BeautifulSoup parse
+    print(f"{'extractor':>12} {'full MB/s':>10} {'full ms/page':>13} {'early-stop ms/page':>19} {'speedup':>8} {'matches bs4':>12}")
+    for name, (full, early) in timings.items():
+        matches = "-" if reference is None else \
+            f"{sum(extract(extractors[name], page) == text for page, text in zip(pages, reference))}/{len(pages)}"
+        speedup = f"{baseline / early:.1f}x" if baseline else "-"
+        print(f"{name:>12} {total_mb / full:>10.1f} {full / len(pages) * 1000:>13.2f} "
+              f"{early / len(pages) * 1000:>19.2f} {speedup:>8} {matches:>12}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
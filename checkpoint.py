@@ -0,0 +1,66 @@
+import os
+import json
+import time
+import uuid
+import threading
+from typing import Any, Dict
+
+
+class RunStore:
+    """
+    Checkpoints of orchestration runs, one directory per run:
+
+        <root>/<run_id>/run.json              query, agent count, subtasks, status, final result
+        <root>/<run_id>/agents/agent_<i>.json  each agent's result and transcript
+
+    Files are written atomically as each piece completes, so a crashed or failed run
+    can be resumed without redoing finished work.
+    """
+
+    def __init__(self, root: str = "runs"):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_run_id() -> str:
+        return time.strftime("%Y%m%d_%H%M%S") + "_" + uuid.uuid4().hex[:6]
+
+    def _path(self, run_id: str, *parts: str) -> str:
+        return os.path.join(self.root, run_id, *parts)
+
+    @staticmethod
+    def _write(path: str, data: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+    def exists(self, run_id: str) -> bool:
+        return os.path.exists(self._path(run_id, "run.json"))
+
+    def load_run(self, run_id: str) -> Dict[str, Any]:
+        with open(self._path(run_id, "run.json"), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_run(self, run_id: str, **fields):
+        """Merge fields into run.json"""
+        with self._lock:
+            run = self.load_run(run_id) if self.exists(run_id) else {"run_id": run_id, "created_at": time.time()}
+            run.update(fields, updated_at=time.time())
+            self._write(self._path(run_id, "run.json"), run)
+
+    def save_agent(self, run_id: str, agent_id: int, result: Dict[str, Any]):
+        self._write(self._path(run_id, "agents", f"agent_{agent_id}.json"), result)
+
+    def load_agents(self, run_id: str) -> Dict[int, Dict[str, Any]]:
+        """Saved agent results keyed by agent id"""
+        agents_dir = self._path(run_id, "agents")
+        results = {}
+        if os.path.isdir(agents_dir):
+            for filename in os.listdir(agents_dir):
+                if filename.startswith("agent_") and filename.endswith(".json"):
+                    with open(os.path.join(agents_dir, filename), 'r', encoding='utf-8') as f:
+                        result = json.load(f)
+                    results[result["agent_id"]] = result
+        return results
@@ -0,0 +1,191 @@
+import json
+from typing import Any, Awaitable, Callable, List, Optional
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    # tiktoken is optional; fall back to the ~4 characters per token heuristic
+    _encoding = None
+
+# Per-message overhead for role and framing tokens
+MESSAGE_OVERHEAD = 4
+
+# Marks the synthetic message that holds summaries of older turns
+SUMMARY_NAME = "context_summary"
+
+SUMMARY_PROMPT = (
+    "Summarize the following earlier research turns of an AI agent. Keep every concrete fact, "
+    "number, name, URL and open question; drop repetition and raw page text.\n\n{turns}"
+)
+
+
+def count_text_tokens(text: str) -> int:
+    """Count tokens in a string"""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def message_field(item, name):
+    """Read a field from either a dict or an API object"""
+    return item.get(name) if isinstance(item, dict) else getattr(item, name, None)
+
+
+def message_text(message) -> str:
+    """All text of a message that is sent to the model, including tool call arguments"""
+    parts = [message_field(message, "content") or ""]
+    for tool_call in message_field(message, "tool_calls") or []:
+        function = message_field(tool_call, "function")
+        parts.append(message_field(function, "name") or "")
+        parts.append(message_field(function, "arguments") or "")
+    return "".join(parts)
+
+
+def count_message_tokens(message) -> int:
+    """Count the prompt tokens a single message contributes"""
+    return MESSAGE_OVERHEAD + count_text_tokens(message_text(message))
+
+
+def extract_key_facts(content: str, max_chars: int = 600) -> str:
+    """Reduce a tool result to its key facts (titles, URLs, snippets) or a short prefix"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        data = None
+
+    if isinstance(data, list) and data and all(isinstance(item, dict) for item in data):
+        # Search-style results: keep one line per hit
+        lines = []
+        for item in data:
+            title = item.get("title") or item.get("error") or ""
+            url = item.get("url", "")
+            snippet = (item.get("snippet") or "")[:200]
+            lines.append(" | ".join(part for part in (title, url, snippet) if part))
+        facts = "\n".join(lines)
+    else:
+        facts = content or ""
+
+    if len(facts) > max_chars:
+        facts = facts[:max_chars] + "..."
+    return json.dumps({"key_facts": facts})
+
+
+class ContextManager:
+    """
+    Keeps an agent conversation under a prompt token budget.
+
+    When the budget is exceeded, policies are applied in order to turns older than the
+    most recent ones until the conversation fits:
+      - key_facts: replace old tool outputs with their extracted key facts
+      - elide_tool_outputs: replace old tool outputs with a short placeholder
+      - summarize: replace old turns with one summary message
+    Tokens saved are recorded per policy in `stats`.
+    """
+
+    POLICIES = ("key_facts", "elide_tool_outputs", "summarize")
+
+    def __init__(self, config: dict, summarizer: Optional[Callable[[str], Awaitable[str]]] = None):
+        context_config = config.get('context', {})
+        self.enabled = context_config.get('enabled', True)
+        self.max_prompt_tokens = context_config.get('max_prompt_tokens', 60000)
+        self.keep_recent_turns = context_config.get('keep_recent_turns', 2)
+        self.policies = [p for p in context_config.get('policies', self.POLICIES) if p in self.POLICIES]
+        self.summarizer = summarizer
+        self.stats = {policy: {"applied": 0, "tokens_saved": 0} for policy in self.POLICIES}
+
+    def count_tokens(self, messages: List[Any]) -> int:
+        """Count prompt tokens for a whole conversation"""
+        return sum(count_message_tokens(message) for message in messages)
+
+    def _split(self, messages: List[Any]):
+        """Split into (protected prefix, old turns, recent turns); a turn is an assistant message plus its tool results"""
+        prefix_end = 0
+        while prefix_end < len(messages) and message_field(messages[prefix_end], "role") != "assistant":
+            prefix_end += 1
+
+        turns = []
+        for message in messages[prefix_end:]:
+            if message_field(message, "role") == "assistant" or not turns:
+                turns.append([])
+            turns[-1].append(message)
+
+        split = max(len(turns) - self.keep_recent_turns, 0)
+        return messages[:prefix_end], turns[:split], turns[split:]
+
+    async def fit(self, messages: List[Any]) -> List[Any]:
+        """Return the conversation reduced to fit the prompt budget"""
+        if not self.enabled or self.count_tokens(messages) <= self.max_prompt_tokens:
+            return messages
+
+        for policy in self.policies:
+            before = self.count_tokens(messages)
+            if policy == "summarize":
+                messages = await self._summarize(messages)
+            else:
+                messages = self._rewrite_tool_outputs(messages, policy)
+            after = self.count_tokens(messages)
+
+            if after < before:
+                self.stats[policy]["applied"] += 1
+                self.stats[policy]["tokens_saved"] += before - after
+            if after <= self.max_prompt_tokens:
+                break
+
+        return messages
+
+    def _rewrite_tool_outputs(self, messages: List[Any], policy: str) -> List[Any]:
+        """Shrink tool outputs in old turns; message order and tool_call_ids are preserved"""
+        prefix, old_turns, recent_turns = self._split(messages)
+        rewritten = []
+        for turn in old_turns:
+            for message in turn:
+                if message_field(message, "role") == "tool":
+                    content = message["content"] or ""
+                    if policy == "key_facts" and not content.startswith(('{"key_facts"', '{"elided"')):
+                        message = {**message, "content": extract_key_facts(content)}
+                    elif policy == "elide_tool_outputs" and not content.startswith('{"elided"'):
+                        elided = json.dumps({"elided": f"{message.get('name', 'tool')} output removed to save context"})
+                        message = {**message, "content": elided}
+                rewritten.append(message)
+        return prefix + rewritten + [message for turn in recent_turns for message in turn]
+
+    async def _summarize(self, messages: List[Any]) -> List[Any]:
+        """Replace old turns (and any earlier summary) with a single summary message"""
+        prefix, old_turns, recent_turns = self._split(messages)
+        if not old_turns:
+            return messages
+
+        # Fold an existing summary into the new one
+        previous = [m for m in prefix if message_field(m, "name") == SUMMARY_NAME]
+        prefix = [m for m in prefix if message_field(m, "name") != SUMMARY_NAME]
+
+        lines = [m["content"] for m in previous]
+        for turn in old_turns:
+            for message in turn:
+                role = message_field(message, "role")
+                text = message_text(message)
+                if text:
+                    lines.append(f"[{role}] {text}")
+        # Keep the summarization request itself within about half the budget
+        turns_text = "\n".join(lines)[:self.max_prompt_tokens * 2]
+
+        summary = None
+        if self.summarizer is not None:
+            try:
+                summary = await self.summarizer(SUMMARY_PROMPT.format(turns=turns_text))
+            except Exception:
+                summary = None
+        if not summary:
+            # Extractive fallback: keep the head of the old turns
+            summary = turns_text[:2000]
+
+        summary_message = {
+            "role": "user",
+            "name": SUMMARY_NAME,
+            "content": f"Summary of earlier research in this conversation:\n{summary}"
+        }
+        return prefix + [summary_message] + [message for turn in recent_turns for message in turn]
+
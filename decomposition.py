@@ -0,0 +1,174 @@
+import json
+from typing import List
+
+
+class IncrementalArrayParser:
+    """
+    Incrementally parses the first JSON array of strings out of streamed model output.
+
+    feed() takes text fragments as they arrive and returns the array elements that were
+    completed by that fragment, so each question can be dispatched as soon as its closing
+    quote arrives. Elements are stripped and blank ones dropped, as in parse_subtasks.
+    Text before the array (prose, code fences) is skipped, and arrays that close without
+    any string (e.g. "[1]" in prose) are ignored.
+    """
+
+    def __init__(self):
+        self.items: List[str] = []
+        self.done = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_depth = 0
+        self._buffer = []
+
+    def feed(self, text: str) -> List[str]:
+        """Consume a fragment and return newly completed top-level strings"""
+        completed = []
+        for char in text:
+            if self.done:
+                break
+
+            if self._in_string:
+                self._buffer.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_depth == 1:
+                        try:
+                            item = json.loads("".join(self._buffer))
+                        except ValueError:
+                            item = None
+                        if isinstance(item, str) and item.strip():
+                            item = item.strip()
+                            self.items.append(item)
+                            completed.append(item)
+                    self._buffer = []
+                continue
+
+            if char == "[":
+                self._depth += 1
+            elif char == "]" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    if self.items:
+                        self.done = True
+            elif char == '"' and self._depth:
+                self._in_string = True
+                self._string_depth = self._depth
+                self._buffer = ['"']
+        return completed
+
+
+# Angles used when the model's question list is missing or short
+FALLBACK_ANGLES = [
+    "Research comprehensive information about: {query}",
+    "Analyze and provide insights about: {query}",
+    "Find alternative perspectives on: {query}",
+    "Verify and cross-check facts about: {query}",
+    "Identify recent developments and current state of: {query}",
+    "Examine risks, limitations and counterarguments regarding: {query}",
+    "Find concrete examples, data and case studies about: {query}",
+    "Summarize expert opinions and authoritative sources on: {query}"
+]
+
+
+def fallback_subtasks(user_input: str, count: int) -> List[str]:
+    """Generate exactly `count` question variations of the user input"""
+    subtasks = []
+    for i in range(count):
+        subtask = FALLBACK_ANGLES[i % len(FALLBACK_ANGLES)].format(query=user_input)
+        if i >= len(FALLBACK_ANGLES):
+            subtask += f" (perspective {i // len(FALLBACK_ANGLES) + 1})"
+        subtasks.append(subtask)
+    return subtasks
+
+
+def complete_subtasks(questions: List[str], user_input: str, count: int) -> List[str]:
+    """Trim or pad a question list to exactly `count` entries"""
+    questions = list(questions[:count])
+    for fallback in fallback_subtasks(user_input, count):
+        if len(questions) >= count:
+            break
+        if fallback not in questions:
+            questions.append(fallback)
+    return questions
+
+
+# Structured-output modes from strictest to none; a provider rejecting one gets the next
+RESPONSE_FORMAT_FALLBACKS = ("json_schema", "json_object", "none")
+
+
+def response_format(mode: str, count: int):
+    """Structured-output request parameter for the decomposition call"""
+    if mode == "json_schema":
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": "subtasks",
+                "strict": True,
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "questions": {
+                            "type": "array",
+                            "items": {"type": "string"},
+                            "minItems": count,
+                            "maxItems": count
+                        }
+                    },
+                    "required": ["questions"],
+                    "additionalProperties": False
+                }
+            }
+        }
+    if mode == "json_object":
+        return {"type": "json_object"}
+    return None
+
+
+def parse_subtasks(text: str) -> List[str]:
+    """
+    Tolerantly extract a list of questions from model output: a JSON array, an object
+    holding one (e.g. {"questions": [...]}), either wrapped in prose or code fences,
+    or as a last resort a numbered / bulleted list.
+    """
+    text = (text or "").strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.startswith("json"):
+            text = text[4:]
+        text = text.strip()
+
+    try:
+        data = json.loads(text)
+    except ValueError:
+        data = None
+
+    if isinstance(data, dict):
+        lists = [value for key, value in data.items() if isinstance(value, list)]
+        data = data.get("questions") if isinstance(data.get("questions"), list) else (lists[0] if lists else None)
+    if isinstance(data, list):
+        questions = [item.strip() for item in data if isinstance(item, str) and item.strip()]
+        if questions:
+            return questions
+
+    # JSON embedded in surrounding text
+    parser = IncrementalArrayParser()
+    parser.feed(text)
+    if parser.items:
+        return parser.items
+
+    # Numbered or bulleted lines
+    questions = []
+    for line in text.splitlines():
+        stripped = line.strip().lstrip("-*•").strip()
+        head, _, rest = stripped.partition(". ")
+        if head.isdigit():
+            stripped = rest.strip()
+        if stripped.endswith("?") or (stripped and stripped != line.strip()):
+            questions.append(stripped.strip('"'))
+    return questions
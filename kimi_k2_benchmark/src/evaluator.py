@@ -128,8 +128,11 @@ def run_single_benchmark_case(model_id: str, task_spec: Dict) -> Dict[str, Any]:
                 )
                 result["accuracy"] = result["qualitative_score"]  # For consistency
 
-            # Estimate tokens (rough approximation)
-            if response_data["completion"]:
+            # Output tokens as reported by the provider, else a rough estimate
+            reported_tokens = result["meta"].get("usage", {}).get("completion_tokens")
+            if reported_tokens:
+                result["output_tokens"] = reported_tokens
+            elif response_data["completion"]:
                 # Rough estimate: 1 token ≈ 4 characters
                 result["output_tokens"] = len(response_data["completion"]) // 4
 
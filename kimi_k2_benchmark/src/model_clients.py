@@ -95,7 +95,7 @@ def run_kimi_direct(prompt: str, timeout: int = 120, **kwargs) -> Dict[str, Any]
 
 
 def run_kimi_via_make_it_heavy(prompt: str, **kwargs) -> Dict[str, Any]:
-    """Run Kimi K2 via make-it-heavy orchestrator with 8 agents"""
+    """Run Kimi K2 via the make-it-heavy orchestrator with its configured (or adaptively planned) agents"""
     try:
         start_time = time.time()
 
@@ -109,6 +109,9 @@ def run_kimi_via_make_it_heavy(prompt: str, **kwargs) -> Dict[str, Any]:
 
         latency = time.time() - start_time
 
+        # Token and cost usage of the whole orchestration, per phase and in total
+        usage = orchestrator.run_stats.get("usage", {})
+
         return {
             "completion": result,
             "reasoning": None,  # Multi-agent doesn't expose individual reasoning
@@ -116,7 +119,9 @@ def run_kimi_via_make_it_heavy(prompt: str, **kwargs) -> Dict[str, Any]:
             "meta": {
                 "model": "moonshotai/kimi-k2-thinking",
                 "provider": "make_it_heavy",
-                "agent_count": 8
+                "agent_count": orchestrator.num_agents,
+                "usage": usage.get("total", {}),
+                "usage_by_phase": usage.get("phases", {})
             }
         }
 
@@ -125,7 +130,7 @@ def run_kimi_via_make_it_heavy(prompt: str, **kwargs) -> Dict[str, Any]:
             "error": str(e),
             "completion": None,
             "latency": time.time() - start_time if 'start_time' in locals() else 0,
-            "meta": {"agent_count": 8}
+            "meta": {"agent_count": orchestrator.num_agents if 'orchestrator' in locals() else None}
         }
 
 
@@ -111,8 +111,41 @@ class TestEvaluator:
         with patch('src.evaluator.model_clients.run_qwen_coder') as mock_run:
             mock_run.return_value = {"error": "Model not available", "completion": None}
 
-            result = evaluator.run_single_benchmark_case(model_id, task_spec)
+            with patch('builtins.open', mock_open()):
+                result = evaluator.run_single_benchmark_case(model_id, task_spec)
 
             assert result['error'] == "Model not available"
             assert result['accuracy'] == 0.0
-            assert 'latency' in result
\ No newline at end of file
+            assert 'latency' in result
+
+    def test_output_tokens_use_reported_completion_tokens(self):
+        """Test that output_tokens is the completion_tokens reported in the client's usage"""
+        task_spec = {"id": "test_task", "prompt": "Test prompt", "has_ground_truth": True, "ground_truth": 42}
+
+        with patch('src.evaluator.model_clients') as mock_clients:
+            mock_clients.run_kimi_direct.return_value = {
+                "completion": "42" + "x" * 398,
+                "latency": 1.0,
+                "meta": {"usage": {"prompt_tokens": 50, "completion_tokens": 123}}
+            }
+
+            with patch('builtins.open', mock_open()):
+                result = evaluator.run_single_benchmark_case("kimi_k2_direct", task_spec)
+
+            assert result['output_tokens'] == 123
+
+    def test_output_tokens_fall_back_to_length_estimate(self):
+        """Test that output_tokens is estimated as len // 4 when no usage is reported"""
+        task_spec = {"id": "test_task", "prompt": "Test prompt", "has_ground_truth": True, "ground_truth": 42}
+
+        with patch('src.evaluator.model_clients') as mock_clients:
+            mock_clients.run_kimi_direct.return_value = {
+                "completion": "42" + "x" * 398,
+                "latency": 1.0,
+                "meta": {"usage": {"completion_tokens": None}}
+            }
+
+            with patch('builtins.open', mock_open()):
+                result = evaluator.run_single_benchmark_case("kimi_k2_direct", task_spec)
+
+            assert result['output_tokens'] == 100
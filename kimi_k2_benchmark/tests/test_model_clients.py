@@ -35,6 +35,7 @@ class TestModelClients:
         with patch('orchestrator.TaskOrchestrator') as MockOrchestrator:
             mock_orchestrator = MockOrchestrator.return_value
             mock_orchestrator.orchestrate.return_value = "Synthesized response"
+            mock_orchestrator.num_agents = 3  # e.g. an adaptive plan below parallel_agents
 
             result = model_clients.run_kimi_via_make_it_heavy(prompt)
 
@@ -43,7 +44,7 @@ class TestModelClients:
             assert 'latency' in result
             assert 'meta' in result
             assert result['completion'] == "Synthesized response"
-            assert result['meta']['agent_count'] == 8
+            assert result['meta']['agent_count'] == 3
 
     def test_run_qwen_coder_handles_unavailability(self):
         """Test that run_qwen_coder gracefully handles when Ollama is not available"""
@@ -0,0 +1,164 @@
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from context_manager import message_field
+from sqlite_lru import SQLiteLRU
+
+MODES = ("off", "read_write", "record_only", "replay_only")
+
+
+class CacheMissError(Exception):
+    """Raised in replay_only mode when a request has no recorded response"""
+
+
+def normalize_messages(messages: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Convert messages to plain dicts for hashing.
+    Tool call ids are generated per run, so they are replaced by positional ids.
+    """
+    call_ids = {}
+    normalized = []
+    for message in messages:
+        entry = {"role": message_field(message, "role"), "content": message_field(message, "content")}
+        if message_field(message, "name"):
+            entry["name"] = message_field(message, "name")
+
+        tool_calls = message_field(message, "tool_calls")
+        if tool_calls:
+            entry["tool_calls"] = []
+            for tool_call in tool_calls:
+                call_ids.setdefault(message_field(tool_call, "id"), f"call_{len(call_ids)}")
+                function = message_field(tool_call, "function")
+                entry["tool_calls"].append({
+                    "id": call_ids[message_field(tool_call, "id")],
+                    "name": message_field(function, "name"),
+                    "arguments": message_field(function, "arguments")
+                })
+
+        if message_field(message, "tool_call_id"):
+            entry["tool_call_id"] = call_ids.get(message_field(message, "tool_call_id"), message_field(message, "tool_call_id"))
+        normalized.append(entry)
+    return normalized
+
+
+def make_key(request: Dict[str, Any]) -> str:
+    """Content-address a request: model, normalized messages, tool schemas and sampling params"""
+    params = {name: value for name, value in request.items() if name not in ("model", "messages", "tools")}
+    payload = {
+        "model": request.get("model"),
+        "messages": normalize_messages(request.get("messages", [])),
+        "tools": request.get("tools") or [],
+        "params": params
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """
+    Two-tier cache of LLM responses: a bounded in-memory LRU in front of a SQLite file
+    with a TTL and size-based (least recently used) eviction.
+
+    Modes:
+      - off: no caching
+      - read_write: serve hits, record misses
+      - record_only: always call the LLM and record the response
+      - replay_only: serve hits, raise CacheMissError on misses (never calls the LLM)
+    """
+
+    def __init__(self, config: dict):
+        cache_config = config.get('llm_cache', {})
+        self.mode = cache_config.get('mode', 'off')
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown llm_cache mode: {self.mode}")
+        self.memory_entries = cache_config.get('memory_entries', 256)
+        self.path = cache_config.get('path', '.cache/llm_cache.sqlite')
+        self.ttl = cache_config.get('ttl', 7 * 24 * 3600)
+        self.max_bytes = cache_config.get('max_bytes', 256 * 1024 * 1024)
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = SQLiteLRU(self.path, "responses", {"value": "TEXT NOT NULL", "created_at": "REAL NOT NULL"}, self.max_bytes)
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "bytes_read": 0,
+            "bytes_written": 0
+        }
+
+    @property
+    def reads(self) -> bool:
+        return self.mode in ("read_write", "replay_only")
+
+    @property
+    def writes(self) -> bool:
+        return self.mode in ("read_write", "record_only")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a recorded response; returns None on a miss"""
+        value = self._memory_get(key)
+        return value if value is not None else self._disk_get(key)
+
+    async def get_async(self, key: str) -> Optional[Dict[str, Any]]:
+        """get() for the event loop: memory hits are served inline, SQLite lookups in a worker thread"""
+        value = self._memory_get(key)
+        if value is not None:
+            return value
+        return await asyncio.get_running_loop().run_in_executor(None, self._disk_get, key)
+
+    async def put_async(self, key: str, response: Dict[str, Any]):
+        """put() for the event loop; the SQLite write and eviction run in a worker thread"""
+        await asyncio.get_running_loop().run_in_executor(None, self.put, key, response)
+
+    def _memory_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None or time.time() - entry[1] > self.ttl:
+                return None
+            self._memory.move_to_end(key)
+            self.stats["memory_hits"] += 1
+            self.stats["bytes_read"] += len(entry[0])
+            return json.loads(entry[0])
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._disk.get(key)
+        if row is None or time.time() - row["created_at"] > self.ttl:
+            if row is not None:
+                self._disk.delete(key)
+            with self._lock:
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            self._remember(key, row["value"], row["created_at"])
+            self.stats["disk_hits"] += 1
+            self.stats["bytes_read"] += len(row["value"])
+        return json.loads(row["value"])
+
+    def put(self, key: str, response: Dict[str, Any]):
+        """Record a response in both tiers, dropping expired and least recently used rows"""
+        value = json.dumps(response)
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            self.stats["writes"] += 1
+            self.stats["bytes_written"] += len(value)
+        evicted = self._disk.delete_older("created_at", now - self.ttl)
+        evicted += self._disk.put(key, len(value), value=value, created_at=now)
+        with self._lock:
+            for evicted_key in evicted:
+                self._memory.pop(evicted_key, None)
+            self.stats["evictions"] += len(evicted)
+
+    def _remember(self, key: str, value: str, created_at: float):
+        """Insert into the memory LRU, dropping the least recently used entry when full"""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
@@ -32,8 +32,14 @@ def main():
                 continue
             
             print("Agent: Thinking...")
-            response = agent.run(user_input)
-            print(f"Agent: {response}")
+            if agent.stream:
+                # Tokens are printed as they arrive
+                print("Agent: ", end="", flush=True)
+                agent.run(user_input, on_token=lambda token: print(token, end="", flush=True))
+                print()
+            else:
+                response = agent.run(user_input)
+                print(f"Agent: {response}")
             
         except KeyboardInterrupt:
             print("\n\nExiting...")
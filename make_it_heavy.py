@@ -8,6 +8,8 @@ class OrchestratorCLI:
         self.orchestrator = TaskOrchestrator()
         self.start_time = None
         self.running = False
+        self.streaming = False
+        self.display_lock = threading.Lock()
         
         # Extract model name for display
         model_full = self.orchestrator.config['openrouter']['model']
@@ -58,6 +60,9 @@ class OrchestratorCLI:
             return f"{ORANGE}●{RESET} " + dots
         elif status == "COMPLETED":
             return f"{ORANGE}●{RESET} " + f"{ORANGE}:" * 70 + f"{RESET}"
+        elif status == "CUT":
+            # Straggler cut by the quorum or deadline
+            return "○ " + "-" * 70
         elif status.startswith("FAILED"):
             return f"{RED}✗{RESET} " + f"{RED}×" * 70 + f"{RESET}"
         else:
@@ -65,9 +70,12 @@ class OrchestratorCLI:
     
     def update_display(self):
         """Update the console display with current status"""
-        if not self.running:
-            return
-            
+        with self.display_lock:
+            if self.running:
+                self._draw_display()
+    
+    def _draw_display(self):
+        """Draw the agent status screen"""
         # Calculate elapsed time
         elapsed = time.time() - self.start_time if self.start_time else 0
         time_str = self.format_time(elapsed)
@@ -95,53 +103,124 @@ class OrchestratorCLI:
         print()
         sys.stdout.flush()
     
+    def print_results_header(self):
+        """Print the banner shown above the final answer"""
+        print("=" * 80)
+        print("FINAL RESULTS")
+        print("=" * 80)
+        print()
+    
+    def render_token(self, token):
+        """Print synthesis tokens as they arrive, replacing the progress display"""
+        with self.display_lock:
+            if not self.streaming:
+                # First token: stop the progress monitor and draw the final status once
+                self.running = False
+                self.streaming = True
+                self._draw_display()
+                self.print_results_header()
+            print(token, end="", flush=True)
+    
     def progress_monitor(self):
         """Monitor and update progress display in separate thread"""
         while self.running:
             self.update_display()
             time.sleep(1.0)  # Update every 1 second (reduced flicker)
     
-    def run_task(self, user_input):
-        """Run orchestrator task with live progress display"""
+    def run_task(self, user_input, resume_run_id=None):
+        """Run orchestrator task (or resume a checkpointed run) with live progress display"""
         self.start_time = time.time()
         self.running = True
+        self.streaming = False
         
         # Start progress monitoring in background thread
         progress_thread = threading.Thread(target=self.progress_monitor, daemon=True)
         progress_thread.start()
         
         try:
-            # Run the orchestrator
-            result = self.orchestrator.orchestrate(user_input)
+            # Run the orchestrator, streaming the synthesized answer as it is generated
+            if resume_run_id:
+                result = self.orchestrator.resume(resume_run_id, on_token=self.render_token)
+            else:
+                result = self.orchestrator.orchestrate(user_input, on_token=self.render_token)
             
-            # Stop progress monitoring
-            self.running = False
-            
-            # Final display update
-            self.update_display()
-            
-            # Show results
-            print("=" * 80)
-            print("FINAL RESULTS")
-            print("=" * 80)
-            print()
-            print(result)
+            if self.streaming and self.orchestrator.synthesis_failed:
+                # The stream broke off mid-answer: show the fallback of the agents' responses
+                print()
+                self.print_results_header()
+                print(result)
+            elif self.streaming:
+                # Answer was already rendered token by token
+                print()
+            else:
+                # Stop progress monitoring
+                with self.display_lock:
+                    self.running = False
+                    
+                    # Final display update
+                    self._draw_display()
+                
+                # Show results
+                self.print_results_header()
+                print(result)
             print()
+            
+            # Report agents cut by the quorum or deadline
+            quorum = self.orchestrator.run_stats.get("quorum", {})
+            if quorum.get("cut_agents"):
+                cut = ", ".join(f"AGENT {agent_id + 1:02d}" for agent_id in quorum["cut_agents"])
+                print(f"Cut ({quorum['cut_reason']}): {cut}")
+            # Report decomposition calls that failed or fell back to a weaker response format
+            decomposition = self.orchestrator.run_stats.get("decomposition", {})
+            for failure in decomposition.get("errors", []):
+                print(f"Decomposition ({failure['response_format']}) failed: {failure['error']}")
+            self.print_usage()
+            self.print_resume_hint()
             print("=" * 80)
             
             return result
             
         except Exception as e:
-            self.running = False
-            self.update_display()
+            with self.display_lock:
+                self.running = False
+                self._draw_display()
             print(f"\nError during orchestration: {str(e)}")
+            self.print_resume_hint()
             return None
     
+    def print_usage(self):
+        """Print token and cost usage per phase and for the whole run"""
+        usage = self.orchestrator.run_stats.get("usage")
+        if not usage or not usage["phases"]:
+            return
+        print()
+        print(f"{'PHASE':<16}{'CALLS':>6}{'PROMPT':>10}{'CACHED':>10}{'OUTPUT':>10}{'REASONING':>11}{'COST':>10}")
+        for phase, entry in list(usage["phases"].items()) + [("total", usage["total"])]:
+            print(f"{phase:<16}{entry['calls']:>6}{entry['prompt_tokens']:>10,}{entry['cached_tokens']:>10,}"
+                  f"{entry['completion_tokens']:>10,}{entry['reasoning_tokens']:>11,}{'$' + format(entry['cost'], '.4f'):>10}")
+        pages = self.orchestrator.run_stats.get("page_fetches")
+        if pages and (pages["pages"] or pages["cache_hits"] or pages["revalidated"]):
+            print(f"Pages: {pages['pages']} read, {pages['skipped']} skipped, "
+                  f"{pages['cache_hits']} from cache, {pages['revalidated']} revalidated, "
+                  f"{pages['bytes_downloaded'] / 1024:,.0f} KB downloaded, {pages['bytes_used'] / 1024:,.0f} KB used")
+        budget = usage["budget"]
+        if budget["max_tokens"] or budget["max_cost"]:
+            state = "exhausted" if budget["exhausted"] else "degraded" if budget["degraded"] else "ok"
+            print(f"Budget: {budget['fraction_used']:.0%} used ({state})")
+    
+    def print_resume_hint(self):
+        """Point at the checkpoint of a run that did not fully complete"""
+        store, run_id = self.orchestrator.run_store, self.orchestrator.run_id
+        if store is not None and run_id and store.exists(run_id):
+            status = store.load_run(run_id).get("status")
+            if status != "completed":
+                print(f"Run {run_id} is {status}; type 'resume {run_id}' to retry only the unfinished parts")
+    
     def interactive_mode(self):
         """Run interactive CLI session"""
         print("Multi-Agent Orchestrator")
         print(f"Configured for {self.orchestrator.num_agents} parallel agents")
-        print("Type 'quit', 'exit', or 'bye' to exit")
+        print("Type 'quit', 'exit', or 'bye' to exit, or 'resume <run_id>' to finish an interrupted run")
         print("-" * 50)
         
         try:
@@ -169,6 +248,14 @@ class OrchestratorCLI:
                     print("Please enter a question or command.")
                     continue
                 
+                if user_input.lower().startswith('resume '):
+                    run_id = user_input.split(None, 1)[1]
+                    print(f"\nOrchestrator: Resuming run {run_id}...")
+                    print()
+                    if self.run_task(None, resume_run_id=run_id) is None:
+                        print("Task failed. Please try again.")
+                    continue
+                
                 print("\nOrchestrator: Starting multi-agent analysis...")
                 print()
                 
@@ -1,32 +1,101 @@
-import json
-import yaml
 import time
+import asyncio
+import statistics
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
 from typing import List, Dict, Any
-from agent import OpenRouterAgent
+from agent import AsyncOpenRouterAgent, prompt_cache_stats
+from runtime import get_runtime, run_sync
+from tracing import Tracer
+from decomposition import (
+    IncrementalArrayParser, RESPONSE_FORMAT_FALLBACKS, complete_subtasks, parse_subtasks, response_format
+)
+from synthesis import TreeSynthesizer
+from tool_cache import ToolResultCache
+from planner import AgentCountPlanner, estimate_complexity
+from backends import agent_summary
+from checkpoint import RunStore
+from usage import UsageLedger
+from rate_limiter import is_bad_request
+from context_manager import count_text_tokens
 
 class TaskOrchestrator:
     def __init__(self, config_path="config.yaml", silent=False):
-        # Load configuration
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+        # Shared runtime: parsed config, pooled HTTP client and tool registry
+        self.runtime = get_runtime(config_path)
+        self.config = self.runtime.config
         
-        self.num_agents = self.config['orchestrator']['parallel_agents']
+        # Configured agent count; num_agents is the current run's (set by resume or the adaptive plan)
+        self.parallel_agents = self.config['orchestrator']['parallel_agents']
+        self.num_agents = self.parallel_agents
         self.task_timeout = self.config['orchestrator']['task_timeout']
         self.aggregation_strategy = self.config['orchestrator']['aggregation_strategy']
+        self.tree_config = self.config['orchestrator'].get('tree_synthesis', {})
+        self.quorum_config = self.config['orchestrator'].get('quorum', {})
+        self.share_tool_results = self.config['orchestrator'].get('share_tool_results', True)
+        
+        # Where agent loops execute: in this process (default), a process pool or queue workers
+        self.backend = self.runtime.execution_backend()
+        
+        # Checkpoints of every run, so failed or interrupted runs can be resumed
+        checkpoint_config = self.config.get('checkpoint', {})
+        self.run_store = RunStore(checkpoint_config.get('dir', 'runs')) if checkpoint_config.get('enabled', True) else None
+        self.run_id = None
+        self.synthesis_failed = False
+        
+        # Token/cost accounting per phase and the orchestration-wide budget
+        self.budget_config = self.config.get('budget', {})
+        self.usage_ledger = None
+        
+        # Per-query agent count (adaptive mode) and the run history it learns from
+        self.planner = AgentCountPlanner(self.config, self.parallel_agents)
         self.silent = silent
         
         # Track agent progress
         self.agent_progress = {}
         self.agent_results = {}
         self.progress_lock = threading.Lock()
+        
+        # Agents created during the current run and the run's statistics
+        self.run_agents = []
+        self.run_stats = {}
+        self.tool_cache = None
+        
+        # Global LLM call scheduler slot gate when run as part of a batch
+        self.llm_gate = None
+        
+        # Optional on_event(event_dict) hook for progress consumers such as the HTTP service
+        self.on_event = None
+        
+        # Span tracing of every run (exported when enabled in config)
+        tracing_config = self.config.get('tracing', {})
+        self.tracing_enabled = tracing_config.get('enabled', False)
+        self.trace_dir = tracing_config.get('output_dir', 'traces')
+        self.tracer = Tracer(enabled=self.tracing_enabled)
+    
+    def _new_agent(self, phase: str) -> AsyncOpenRouterAgent:
+        """Create an agent for one phase of the current run"""
+        agent = AsyncOpenRouterAgent(silent=True, runtime=self.runtime)
+        agent.tracer = self.tracer
+        agent.tool_cache = self.tool_cache
+        agent.llm_gate = self.llm_gate
+        agent.usage_ledger = self.usage_ledger
+        agent.phase = phase
+        self.run_agents.append((phase, agent))
+        return agent
     
     def decompose_task(self, user_input: str, num_agents: int) -> List[str]:
         """Use AI to dynamically generate different questions based on user input"""
+        return run_sync(self.decompose_task_async(user_input, num_agents))
+    
+    async def decompose_task_async(self, user_input: str, num_agents: int, on_subtask=None) -> List[str]:
+        """
+        Use AI to dynamically generate different questions based on user input.
+        When streaming, on_subtask(index, question) is called as soon as each question is complete.
+        """
         
-        # Create question generation agent
-        question_agent = OpenRouterAgent(silent=True)
+        # Question generation is a single tool-free structured-output call
+        question_agent = self._new_agent("decomposition")
         
         # Get question generation prompt from config
         prompt_template = self.config['orchestrator']['question_generation_prompt']
@@ -35,31 +104,55 @@ class TaskOrchestrator:
             num_agents=num_agents
         )
         
-        # Remove task completion tool to avoid issues
-        question_agent.tools = [tool for tool in question_agent.tools if tool.get('function', {}).get('name') != 'mark_task_complete']
-        question_agent.tool_mapping = {name: func for name, func in question_agent.tool_mapping.items() if name != 'mark_task_complete'}
+        # Parse the question array while it streams in
+        parser = IncrementalArrayParser()
         
-        try:
-            # Get AI-generated questions
-            response = question_agent.run(generation_prompt)
-            
-            # Parse JSON response
-            questions = json.loads(response.strip())
-            
-            # Validate we got the right number of questions
-            if len(questions) != num_agents:
-                raise ValueError(f"Expected {num_agents} questions, got {len(questions)}")
-            
-            return questions
-            
-        except (json.JSONDecodeError, ValueError) as e:
-            # Fallback: create simple variations if AI fails
-            return [
-                f"Research comprehensive information about: {user_input}",
-                f"Analyze and provide insights about: {user_input}",
-                f"Find alternative perspectives on: {user_input}",
-                f"Verify and cross-check facts about: {user_input}"
-            ][:num_agents]
+        def on_token(token):
+            for question in parser.feed(token):
+                index = len(parser.items) - 1
+                if on_subtask and index < num_agents:
+                    on_subtask(index, question)
+        
+        # A provider that rejects the structured-output format (400) is retried with the
+        # next weaker one; every failure is kept in run_stats and the trace
+        format_mode = self.config['orchestrator'].get('decomposition_response_format', 'json_schema')
+        modes = RESPONSE_FORMAT_FALLBACKS[RESPONSE_FORMAT_FALLBACKS.index(format_mode):] \
+            if format_mode in RESPONSE_FORMAT_FALLBACKS else [format_mode]
+        stats = {"response_format": None, "errors": []}
+        self.run_stats["decomposition"] = stats
+        response = ""
+        for mode in modes:
+            params = {}
+            if response_format(mode, num_agents):
+                params["response_format"] = response_format(mode, num_agents)
+            try:
+                with self.tracer.span("decomposition_call", response_format=mode):
+                    # Get AI-generated questions
+                    response = await question_agent.complete(generation_prompt, on_token=on_token, **params)
+                stats["response_format"] = mode
+                break
+            except Exception as e:
+                stats["errors"].append({"response_format": mode, "error": str(e)})
+                # Questions already streamed were dispatched; only a rejected request is retried
+                if parser.items or not is_bad_request(e):
+                    break
+        
+        # Questions already dispatched while streaming are authoritative
+        questions = parser.items if parser.items else parse_subtasks(response)
+        stats["generated"] = len(questions)
+        
+        # Always exactly num_agents questions, padded with fallback variations if needed
+        return complete_subtasks(questions, user_input, num_agents)
+    
+    def _checkpoint(self, **fields):
+        """Record run state in the run's checkpoint, if checkpointing is enabled"""
+        if self.run_store is not None:
+            self.run_store.save_run(self.run_id, **fields)
+    
+    def emit(self, event_type: str, **data):
+        """Send a progress event to the on_event hook, if any"""
+        if self.on_event is not None:
+            self.on_event({"type": event_type, "time": time.time(), **data})
     
     def update_agent_progress(self, agent_id: int, status: str, result: str = None):
         """Thread-safe progress tracking"""
@@ -67,30 +160,51 @@ class TaskOrchestrator:
             self.agent_progress[agent_id] = status
             if result is not None:
                 self.agent_results[agent_id] = result
+        self.emit("agent_status", agent_id=agent_id, status=status)
     
     def run_agent_parallel(self, agent_id: int, subtask: str) -> Dict[str, Any]:
         """
         Run a single agent with the given subtask.
         Returns result dictionary with agent_id, status, and response.
         """
+        return run_sync(self.run_agent_async(agent_id, subtask))
+    
+    async def run_agent_async(self, agent_id: int, subtask: str, hedge: bool = False) -> Dict[str, Any]:
+        """
+        Run a single agent with the given subtask as a coroutine.
+        Returns result dictionary with agent_id, status, and response.
+        hedge marks a duplicate attempt launched for a straggler.
+        """
         try:
+            if self.usage_ledger is not None and self.usage_ledger.exhausted():
+                raise Exception("Run token/cost budget exhausted")
             self.update_agent_progress(agent_id, "PROCESSING...")
             
-            # Use simple agent like in main.py
-            agent = OpenRouterAgent(silent=True)
-            
             start_time = time.time()
-            response = agent.run(subtask)
-            execution_time = time.time() - start_time
+            with self.tracer.span("run_agent", agent_id=agent_id, subtask_bytes=len(subtask), hedge=hedge) as span:
+                if self.backend is None:
+                    # Use simple agent like in main.py
+                    agent = self._new_agent(f"agent_{agent_id}")
+                    agent.run_budget = self.usage_ledger
+                    summary = agent_summary(agent, await agent.run(subtask), time.time() - start_time)
+                else:
+                    # Out-of-process agents; their LLM and tool calls are not traced here
+                    summary = await self.backend.run_agent(agent_id, subtask)
+                    if self.usage_ledger is not None:
+                        self.usage_ledger.add(f"agent_{agent_id}", summary["usage"])
+                span.set(stop_reason=summary["stop_reason"], response_bytes=len(summary["response"]), **summary["usage"])
             
-            self.update_agent_progress(agent_id, "COMPLETED", response)
+            self.update_agent_progress(agent_id, "COMPLETED", summary["response"])
             
-            return {
+            result = {
                 "agent_id": agent_id,
-                "status": "success", 
-                "response": response,
-                "execution_time": execution_time
+                "status": "success",
+                **summary,
+                "execution_time": time.time() - start_time
             }
+            if self.run_store is not None:
+                self.run_store.save_agent(self.run_id, agent_id, result)
+            return result
             
         except Exception as e:
             # Simple error handling
@@ -101,11 +215,121 @@ class TaskOrchestrator:
                 "execution_time": 0
             }
     
-    def aggregate_results(self, agent_results: List[Dict[str, Any]]) -> str:
+    async def _collect_results(self, task_to_agent: Dict[asyncio.Task, int], dispatch_times: Dict[int, float],
+                               subtasks: List[str], run_context: contextvars.Context,
+                               synthesizer: TreeSynthesizer = None) -> List[Dict[str, Any]]:
+        """
+        Wait for agent results until enough agents succeeded (quorum) or the deadline
+        passes, then cancel the rest. With hedging, an agent running longer than
+        lag_ratio x the p50 run time of its finished peers gets a duplicate attempt and
+        the first success wins. Finished responses are fed to the synthesizer as they arrive.
+        """
+        required = min(self.quorum_config.get('min_success') or self.num_agents, self.num_agents)
+        deadline = time.time() + (self.quorum_config.get('deadline') or self.task_timeout)
+        check_interval = self.quorum_config.get('check_interval', 1.0)
+        hedging = self.quorum_config.get('hedging', {})
+        
+        attempts = {agent_id: {task} for task, agent_id in task_to_agent.items()}
+        results = {}
+        durations = []
+        hedged = []
+        hedge_tasks = set()
+        cut_reason = None
+        
+        while any(attempts.values()):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                cut_reason = "deadline"
+                break
+            
+            live = set().union(*attempts.values())
+            done, _ = await asyncio.wait(live, timeout=min(remaining, check_interval),
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                agent_id = task_to_agent[task]
+                attempts[agent_id].discard(task)
+                if agent_id in results:
+                    continue
+                result = task.result() if not task.cancelled() and task.exception() is None else None
+                if result and result["status"] == "success":
+                    # First successful attempt wins; cancel the other attempt of this agent
+                    result["hedged"] = task in hedge_tasks
+                    results[agent_id] = result
+                    durations.append(result["execution_time"])
+                    for other in attempts[agent_id]:
+                        other.cancel()
+                    attempts[agent_id] = set()
+                    if synthesizer is not None:
+                        synthesizer.add(result["response"])
+                elif not attempts[agent_id]:
+                    results[agent_id] = result or {
+                        "agent_id": agent_id,
+                        "status": "error",
+                        "response": f"Agent {agent_id + 1} failed: {task.exception() if not task.cancelled() else 'cancelled'}",
+                        "execution_time": time.time() - dispatch_times[agent_id]
+                    }
+                    if synthesizer is not None:
+                        synthesizer.add(None)
+            
+            successes = sum(1 for r in results.values() if r["status"] == "success")
+            if successes >= required and any(attempts.values()):
+                cut_reason = "quorum"
+                break
+            
+            # Hedge stragglers once at least half of the agents have finished, unless the budget is tight
+            if (hedging.get('enabled') and len(durations) * 2 >= self.num_agents
+                    and not (self.usage_ledger is not None and self.usage_ledger.degraded())):
+                lag_limit = hedging.get('lag_ratio', 1.5) * statistics.median(durations)
+                for agent_id, live_attempts in attempts.items():
+                    if len(hedged) >= hedging.get('max_hedges', 2):
+                        break
+                    if live_attempts and agent_id not in hedged and time.time() - dispatch_times[agent_id] > lag_limit:
+                        hedged.append(agent_id)
+                        task = run_context.run(asyncio.ensure_future,
+                                               self.run_agent_async(agent_id, subtasks[agent_id], hedge=True))
+                        task_to_agent[task] = agent_id
+                        hedge_tasks.add(task)
+                        live_attempts.add(task)
+        
+        # Cut agents that did not finish in time or are no longer needed
+        cut_agents = []
+        for agent_id, live_attempts in attempts.items():
+            for task in live_attempts:
+                task.cancel()
+            if agent_id not in results:
+                cut_agents.append(agent_id)
+                self.update_agent_progress(agent_id, "CUT")
+                results[agent_id] = {
+                    "agent_id": agent_id,
+                    "status": "timeout" if cut_reason == "deadline" else "cut",
+                    "response": f"Agent {agent_id + 1} was cut ({cut_reason}) before finishing",
+                    "execution_time": time.time() - dispatch_times[agent_id]
+                }
+        
+        self.run_stats["quorum"] = {
+            "required": required,
+            "succeeded": sum(1 for r in results.values() if r["status"] == "success"),
+            "cut_reason": cut_reason,
+            "cut_agents": sorted(cut_agents),
+            "hedged_agents": hedged,
+            "hedge_wins": sorted(a for a, r in results.items() if r.get("hedged"))
+        }
+        
+        # Sort results by agent_id for consistent output
+        return sorted(results.values(), key=lambda x: x["agent_id"])
+    
+    def aggregate_results(self, agent_results: List[Dict[str, Any]], on_token=None) -> str:
         """
         Combine results from all agents into a comprehensive final answer.
         Uses the configured aggregation strategy.
         """
+        return run_sync(self.aggregate_results_async(agent_results, on_token=on_token))
+    
+    async def aggregate_results_async(self, agent_results: List[Dict[str, Any]], on_token=None) -> str:
+        """
+        Combine results from all agents into a comprehensive final answer.
+        Uses the configured aggregation strategy; synthesis tokens are streamed to on_token.
+        """
         successful_results = [r for r in agent_results if r["status"] == "success"]
         
         if not successful_results:
@@ -115,12 +339,17 @@ class TaskOrchestrator:
         responses = [r["response"] for r in successful_results]
         
         if self.aggregation_strategy == "consensus":
-            return self._aggregate_consensus(responses, successful_results)
+            return await self._aggregate_consensus(responses, successful_results, on_token=on_token)
+        elif self.aggregation_strategy == "tree":
+            synthesizer = self._tree_synthesizer(len(responses))
+            for response in responses:
+                synthesizer.add(response)
+            return await self._finish_tree(synthesizer, on_token=on_token)
         else:
             # Default to consensus
-            return self._aggregate_consensus(responses, successful_results)
+            return await self._aggregate_consensus(responses, successful_results, on_token=on_token)
     
-    def _aggregate_consensus(self, responses: List[str], _results: List[Dict[str, Any]]) -> str:
+    async def _aggregate_consensus(self, responses: List[str], _results: List[Dict[str, Any]], on_token=None) -> str:
         """
         Use one final AI call to synthesize all agent responses into a coherent answer.
         """
@@ -128,7 +357,7 @@ class TaskOrchestrator:
             return responses[0]
         
         # Create synthesis agent to combine all responses
-        synthesis_agent = OpenRouterAgent(silent=True)
+        synthesis_agent = self._new_agent("synthesis")
         
         # Build agent responses section
         agent_responses_text = ""
@@ -141,6 +370,11 @@ class TaskOrchestrator:
             num_responses=len(responses),
             agent_responses=agent_responses_text
         )
+        self.run_stats["synthesis"] = {
+            "strategy": "consensus",
+            "final_merge_inputs": len(responses),
+            "final_prompt_tokens": count_text_tokens(synthesis_prompt)
+        }
         
         # Completely remove all tools from synthesis agent to force direct response
         synthesis_agent.tools = []
@@ -148,9 +382,12 @@ class TaskOrchestrator:
         
         # Get the synthesized response
         try:
-            final_answer = synthesis_agent.run(synthesis_prompt)
+            with self.tracer.span("synthesis", num_responses=len(responses), prompt_bytes=len(synthesis_prompt)) as span:
+                final_answer = await synthesis_agent.run(synthesis_prompt, on_token=on_token)
+                span.set(stop_reason=synthesis_agent.stop_reason, response_bytes=len(final_answer), **synthesis_agent.usage)
             return final_answer
         except Exception as e:
+            self.synthesis_failed = True
             # Log the error for debugging
             print(f"\n🚨 SYNTHESIS FAILED: {str(e)}")
             print("📋 Falling back to concatenated responses\n")
@@ -162,56 +399,261 @@ class TaskOrchestrator:
                 combined.append("")
             return "\n".join(combined)
     
+    def _tree_synthesizer(self, expected: int) -> TreeSynthesizer:
+        """Create the incremental map-reduce synthesizer for `expected` agent responses"""
+        return TreeSynthesizer(
+            self._merge_responses,
+            expected,
+            fan_in=self.tree_config.get('fan_in', 2),
+            max_input_tokens=self.tree_config.get('max_merge_input_tokens', 12000)
+        )
+    
+    async def _finish_tree(self, synthesizer: TreeSynthesizer, on_token=None) -> str:
+        """Run the final merge of a tree synthesis and record its statistics"""
+        final_answer = await synthesizer.finish(on_token=on_token)
+        self.run_stats["synthesis"] = {"strategy": "tree", **synthesizer.stats}
+        if final_answer is None:
+            return "All agents failed to provide results. Please try again."
+        return final_answer
+    
+    async def _merge_responses(self, responses: List[str], final: bool, on_token=None) -> str:
+        """
+        One node of the synthesis tree: intermediate merges condense partial results
+        with the merge prompt, the final merge uses the regular synthesis prompt.
+        """
+        merge_agent = self._new_agent("synthesis" if final else "merge")
+        
+        agent_responses_text = ""
+        for i, response in enumerate(responses, 1):
+            agent_responses_text += f"=== AGENT {i} RESPONSE ===\n{response}\n\n"
+        
+        prompt_key = 'synthesis_prompt' if final else 'merge_prompt'
+        prompt = self.config['orchestrator'][prompt_key].format(
+            num_responses=len(responses),
+            agent_responses=agent_responses_text
+        )
+        
+        # Intermediate merges are capped so they stay small inputs for the next level
+        params = {} if final else {"max_tokens": self.tree_config.get('merge_max_tokens', 2000)}
+        
+        try:
+            with self.tracer.span("synthesis" if final else "merge", num_responses=len(responses),
+                                  prompt_bytes=len(prompt)) as span:
+                merged = await merge_agent.complete(prompt, on_token=on_token if final else None, **params)
+                span.set(stop_reason=merge_agent.stop_reason, response_bytes=len(merged), **merge_agent.usage)
+            return merged
+        except Exception as e:
+            if final:
+                self.synthesis_failed = True
+                print(f"\n🚨 SYNTHESIS FAILED: {str(e)}")
+                print("📋 Falling back to concatenated responses\n")
+            # Keep the inputs rather than losing them
+            return "\n\n".join(responses)
+    
+    def _pipelining_stats(self, decomposition_start: float, decomposition_end: float,
+                          dispatch_times: Dict[int, float], agent_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Critical-path latency saved by starting agents during decomposition.
+        Without pipelining every agent would start at decomposition_end, so the agent
+        phase would end at decomposition_end + the longest agent run.
+        """
+        durations = {r["agent_id"]: r["execution_time"] for r in agent_results}
+        early = [agent_id for agent_id, started in dispatch_times.items() if started < decomposition_end]
+        pipelined_end = max(dispatch_times[a] + durations.get(a, 0) for a in dispatch_times)
+        sequential_end = decomposition_end + max(durations.values(), default=0)
+        return {
+            "decomposition_time": decomposition_end - decomposition_start,
+            "agents_started_early": len(early),
+            "max_head_start": max((decomposition_end - dispatch_times[a] for a in early), default=0.0),
+            "critical_path_saved": max(sequential_end - pipelined_end, 0.0)
+        }
+    
     def get_progress_status(self) -> Dict[int, str]:
         """Get current progress status for all agents"""
         with self.progress_lock:
             return self.agent_progress.copy()
     
-    def orchestrate(self, user_input: str):
+    def orchestrate(self, user_input: str, on_token=None):
         """
         Main orchestration method.
         Takes user input, delegates to parallel agents, and returns aggregated result.
+        If given, on_token receives the final synthesis tokens as they stream in.
+        """
+        return run_sync(self.orchestrate_async(user_input, on_token=on_token))
+    
+    def resume(self, run_id: str, on_token=None):
+        """Resume a checkpointed run, redoing only its missing or failed pieces"""
+        return run_sync(self.resume_async(run_id, on_token=on_token))
+    
+    async def resume_async(self, run_id: str, on_token=None):
+        """
+        Async resume: finished agents are reused from the checkpoint, missing or failed
+        ones rerun, and synthesis runs again if it did not complete.
+        """
+        self.run_id = run_id
+        if self.run_store is None or not self.run_store.exists(run_id):
+            raise ValueError(f"No checkpoint for run {run_id}")
+        run = self.run_store.load_run(run_id)
+        if run.get("status") == "completed":
+            return run["result"]
+        return await self.orchestrate_async(run["query"], on_token=on_token, run_id=run_id)
+    
+    async def orchestrate_async(self, user_input: str, on_token=None, run_id: str = None):
         """
+        Async orchestration method.
+        Decomposition, every agent and synthesis run as coroutines on one event loop.
+        Passing the run_id of a checkpointed run resumes it.
+        """
+        self.tracer = Tracer(enabled=self.tracing_enabled)
+        self.run_id = run_id or RunStore.new_run_id()
+        self.usage_ledger = UsageLedger(
+            max_tokens=self.budget_config.get('max_tokens'),
+            max_cost=self.budget_config.get('max_cost'),
+            degrade_at=self.budget_config.get('degrade_at', 0.8)
+        )
+        start_time = time.time()
+        with self.tracer.span("orchestrate", query_bytes=len(user_input)):
+            final_result = await self._orchestrate(user_input, on_token)
+        self.run_stats["usage"] = self.usage_ledger.stats
+        
+        # Record the run for the adaptive planner's latency and cost model (resumed runs would skew it)
+        if self.planner.enabled and "resumed_agents" not in self.run_stats:
+            plan = self.run_stats.get("plan", {})
+            self.planner.history.record({
+                "timestamp": start_time,
+                "num_agents": self.num_agents,
+                "complexity": plan.get("complexity", estimate_complexity(user_input)),
+                "fast_path": plan.get("fast_path", False),
+                "duration": time.time() - start_time,
+                "total_tokens": self.usage_ledger.total["prompt_tokens"] + self.usage_ledger.total["completion_tokens"]
+            })
         
+        # Export the run's spans as JSONL and Chrome trace events
+        if self.tracing_enabled:
+            run_name = f"run_{self.run_id}"
+            self.run_stats["trace_files"] = self.tracer.export(self.trace_dir, run_name)
+        
+        return final_result
+    
+    async def _orchestrate(self, user_input: str, on_token=None):
+        """Decompose, run all agents and synthesize, inside the run's root span"""
         # Reset progress tracking
         self.agent_progress = {}
         self.agent_results = {}
+        self.run_agents = []
+        self.run_stats = {"run_id": self.run_id}
+        self.synthesis_failed = False
+        self.num_agents = self.parallel_agents
+        
+        # Read-only tool results are shared by the agents of this run only
+        self.tool_cache = ToolResultCache(self.runtime.tools) if self.share_tool_results else None
         
-        # Decompose task into subtasks
-        subtasks = self.decompose_task(user_input, self.num_agents)
+        # State of a resumed run: its agent count, subtasks and finished agents
+        checkpoint = {}
+        saved_results = {}
+        if self.run_store is not None and self.run_store.exists(self.run_id):
+            checkpoint = self.run_store.load_run(self.run_id)
+            saved_results = {agent_id: result for agent_id, result in self.run_store.load_agents(self.run_id).items()
+                             if result["status"] == "success"}
+            self.num_agents = checkpoint["num_agents"]
+            self.run_stats["resumed_agents"] = sorted(saved_results)
+            # Work of earlier attempts counts against the run's budget too
+            for agent_id, result in saved_results.items():
+                self.usage_ledger.add(f"agent_{agent_id}", result.get("usage"))
+        elif self.planner.enabled:
+            # Adaptive mode picks the agent count for this query
+            plan = self.planner.plan(user_input)
+            self.num_agents = plan["num_agents"]
+            self.run_stats["plan"] = plan
+        fast_path = checkpoint.get("fast_path", self.run_stats.get("plan", {}).get("fast_path", False))
+        self._checkpoint(query=user_input, num_agents=self.num_agents, fast_path=fast_path, status="running")
         
         # Initialize progress tracking
         for i in range(self.num_agents):
-            self.agent_progress[i] = "QUEUED"
+            self.agent_progress[i] = "COMPLETED" if i in saved_results else "QUEUED"
         
-        # Execute agents in parallel
-        agent_results = []
+        self.emit("started", num_agents=self.num_agents)
         
-        with ThreadPoolExecutor(max_workers=self.num_agents) as executor:
-            # Submit all agent tasks
-            future_to_agent = {
-                executor.submit(self.run_agent_parallel, i, subtasks[i]): i 
-                for i in range(self.num_agents)
-            }
-            
-            # Collect results as they complete
-            for future in as_completed(future_to_agent, timeout=self.task_timeout):
-                try:
-                    result = future.result()
-                    agent_results.append(result)
-                except Exception as e:
-                    agent_id = future_to_agent[future]
-                    agent_results.append({
-                        "agent_id": agent_id,
-                        "status": "timeout",
-                        "response": f"Agent {agent_id + 1} timed out or failed: {str(e)}",
-                        "execution_time": self.task_timeout
-                    })
+        # Fast path: simple queries go straight to one agent, without decomposition or synthesis
+        if fast_path:
+            result = saved_results.get(0) or await self.run_agent_async(0, user_input)
+            self._checkpoint(status="completed" if result["status"] == "success" else "failed", result=result["response"])
+            return result["response"]
         
-        # Sort results by agent_id for consistent output
-        agent_results.sort(key=lambda x: x["agent_id"])
+        # Agents are started from outside the decomposition span
+        run_context = contextvars.copy_context()
+        task_to_agent = {}
+        dispatch_times = {}
+        
+        def dispatch(agent_id: int, subtask: str):
+            """Start an agent as soon as its subtask is known"""
+            if agent_id not in dispatch_times:
+                dispatch_times[agent_id] = time.time()
+                self.emit("subtask", agent_id=agent_id, question=subtask)
+                if agent_id in saved_results:
+                    # Finished in an earlier attempt of this run
+                    task = asyncio.get_running_loop().create_future()
+                    task.set_result(saved_results[agent_id])
+                else:
+                    task = run_context.run(asyncio.ensure_future, self.run_agent_async(agent_id, subtask))
+                task_to_agent[task] = agent_id
+        
+        # Decompose task into subtasks; agents start while the question list is still streaming
+        decomposition_start = time.time()
+        if checkpoint.get("subtasks"):
+            subtasks = checkpoint["subtasks"]
+        else:
+            with self.tracer.span("decompose_task", num_agents=self.num_agents) as span:
+                subtasks = await self.decompose_task_async(user_input, self.num_agents, on_subtask=dispatch)
+                span.set(subtasks=len(subtasks), dispatched_early=len(dispatch_times))
+            self._checkpoint(subtasks=subtasks)
+        decomposition_end = time.time()
+        
+        # Submit the remaining agent tasks
+        for i in range(self.num_agents):
+            dispatch(i, subtasks[i])
+        
+        # Tree synthesis merges responses while the remaining agents are still running
+        synthesizer = self._tree_synthesizer(self.num_agents) if self.aggregation_strategy == "tree" else None
+        
+        # Wait for a quorum of agents or the deadline; stragglers are cut
+        agent_results = await self._collect_results(task_to_agent, dispatch_times, subtasks, run_context, synthesizer)
+        agents_done = time.time()
+        self.run_stats["pipelining"] = self._pipelining_stats(
+            decomposition_start, decomposition_end, dispatch_times, agent_results
+        )
         
         # Aggregate results
-        final_result = self.aggregate_results(agent_results)
+        self.emit("synthesis")
+        if synthesizer is not None and any(r["status"] == "success" for r in agent_results):
+            final_result = await self._finish_tree(synthesizer, on_token=on_token)
+        else:
+            final_result = await self.aggregate_results_async(agent_results, on_token=on_token)
+        if "synthesis" in self.run_stats:
+            self.run_stats["synthesis"]["tail_latency"] = time.time() - agents_done
+        
+        if self.tool_cache is not None:
+            self.run_stats["tool_cache"] = dict(self.tool_cache.stats)
+        
+        # Page download volume of the search tool (process-wide totals): bytes read vs text kept
+        search_tool = self.runtime.tools.get("search_web")
+        if search_tool is not None and hasattr(search_tool, "stats"):
+            self.run_stats["page_fetches"] = dict(search_tool.stats)
         
+        # Provider prompt-cache reuse across every call of the run
+        self.run_stats["prompt_cache"] = prompt_cache_stats(
+            [metrics for _, agent in self.run_agents for metrics in agent.call_metrics]
+        )
+        
+        # Anything short of "completed" can be resumed
+        succeeded = sum(1 for r in agent_results if r["status"] == "success")
+        if succeeded == 0:
+            status = "failed"
+        elif self.synthesis_failed:
+            status = "synthesis_failed"
+        elif succeeded < self.num_agents:
+            status = "partial"
+        else:
+            status = "completed"
+        self._checkpoint(status=status, result=final_result)
         return final_result
\ No newline at end of file
@@ -0,0 +1,143 @@
+import os
+import re
+import json
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Bare arithmetic such as "what is 17 * 23?" never needs more than one agent
+ARITHMETIC = re.compile(r"(?=.*\d)(what is|what's|calculate|compute|evaluate)?[\d\s.,+\-*/^()%=x]+\??")
+
+# Wording that signals a broad question worth covering from several angles
+RESEARCH_TERMS = (
+    "research", "analy", "compare", "comparison", "versus", " vs", "pros and cons", "trade-off",
+    "impact", "history", "trend", "latest", "future", "strategy", "evaluate", "review",
+    "comprehensive", "in depth", "in-depth", "implications", "perspectives", "landscape"
+)
+
+
+def estimate_complexity(query: str) -> float:
+    """Cheap 0..1 estimate of how much a query benefits from several agents"""
+    text = " ".join(query.lower().split())
+    if not text or ARITHMETIC.fullmatch(text):
+        return 0.0
+
+    score = min(len(text.split()) / 40, 0.4)
+    score += 0.15 * min(sum(term in text for term in RESEARCH_TERMS), 3)
+    score += 0.1 * min(max(text.count("?") - 1, 0), 2)
+    score += 0.05 * min(text.count(" and ") + text.count(","), 3)
+    return min(score, 1.0)
+
+
+class RunHistory:
+    """JSONL record of the most recent runs, used to predict latency and cost per agent count"""
+
+    def __init__(self, path: str, max_runs: int = 200):
+        self.path = path
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+
+    def _tail(self, count: int) -> List[str]:
+        """Last count lines of the file, read without holding the rest in memory"""
+        if count <= 0 or not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return list(deque(f, maxlen=count))
+
+    def load(self) -> List[Dict[str, Any]]:
+        """Most recent runs, oldest first"""
+        if not self.path:
+            return []
+        with self._lock:
+            lines = self._tail(self.max_runs)
+        runs = []
+        for line in lines:
+            try:
+                runs.append(json.loads(line))
+            except ValueError:
+                continue
+        return runs
+
+    def record(self, run: Dict[str, Any]):
+        """Append a run; once the file holds max_runs runs it is compacted to the most recent ones"""
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            lines = self._tail(self.max_runs)
+            if len(lines) < self.max_runs:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(run) + "\n")
+                return
+            lines = lines[len(lines) - self.max_runs + 1:] + [json.dumps(run) + "\n"]
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+            os.replace(temp_path, self.path)
+
+
+def fit_linear(points: List[tuple]) -> Optional[tuple]:
+    """Least-squares fit y = a + b*x; None without at least two distinct x values"""
+    xs = [x for x, _ in points]
+    if len(set(xs)) < 2:
+        return None
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(y for _, y in points) / len(points)
+    b = sum((x - mean_x) * (y - mean_y) for x, y in points) / sum((x - mean_x) ** 2 for x in xs)
+    return mean_y - b * mean_x, b
+
+
+class AgentCountPlanner:
+    """
+    Picks the number of agents for a query.
+
+    The complexity estimate maps a query onto [min_agents, max_agents]; queries
+    below fast_path_threshold use a single agent without decomposition or synthesis.
+    Latency and token cost are modelled as linear in the agent count, fitted on the
+    recorded history of past multi-agent runs; the count is lowered until the
+    predicted latency meets latency_slo.
+    """
+
+    def __init__(self, config: dict, max_agents: int):
+        adaptive_config = config.get('orchestrator', {}).get('adaptive', {})
+        self.enabled = adaptive_config.get('enabled', False)
+        self.max_agents = adaptive_config.get('max_agents') or max_agents
+        self.min_agents = min(adaptive_config.get('min_agents', 2), self.max_agents)
+        self.fast_path_threshold = adaptive_config.get('fast_path_threshold', 0.2)
+        self.latency_slo = adaptive_config.get('latency_slo', 0)
+        self.history = RunHistory(adaptive_config.get('history_path', '.cache/run_history.jsonl'),
+                                  adaptive_config.get('history_runs', 200))
+
+    def models(self) -> Dict[str, Optional[tuple]]:
+        """Latency (seconds) and token models fitted on past multi-agent runs"""
+        runs = [run for run in self.history.load() if not run.get("fast_path")]
+        return {
+            "latency": fit_linear([(run["num_agents"], run["duration"]) for run in runs]),
+            "tokens": fit_linear([(run["num_agents"], run["total_tokens"]) for run in runs])
+        }
+
+    @staticmethod
+    def predict(model: Optional[tuple], num_agents: int) -> Optional[float]:
+        return None if model is None else model[0] + model[1] * num_agents
+
+    def plan(self, query: str) -> Dict[str, Any]:
+        """Agent count for a query, with the estimate and predictions behind it"""
+        complexity = estimate_complexity(query)
+        if complexity < self.fast_path_threshold:
+            num_agents = 1
+        else:
+            num_agents = self.min_agents + round(complexity * (self.max_agents - self.min_agents))
+
+        models = self.models()
+        if num_agents > 1 and self.latency_slo:
+            while num_agents > self.min_agents and (self.predict(models["latency"], num_agents) or 0) > self.latency_slo:
+                num_agents -= 1
+
+        return {
+            "complexity": round(complexity, 3),
+            "num_agents": num_agents,
+            "fast_path": num_agents == 1,
+            "latency_slo": self.latency_slo or None,
+            "predicted_latency": self.predict(models["latency"], num_agents) if num_agents > 1 else None,
+            "predicted_tokens": self.predict(models["tokens"], num_agents) if num_agents > 1 else None
+        }
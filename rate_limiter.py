@@ -0,0 +1,193 @@
+import time
+import random
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import openai
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether an LLM call error is worth retrying"""
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409) or error.status_code >= 500
+    return False
+
+
+def is_bad_request(error: Exception) -> bool:
+    """Whether an LLM call was rejected as invalid (400), looking through wrapping exceptions"""
+    while error is not None:
+        if isinstance(error, openai.APIStatusError) and error.status_code == 400:
+            return True
+        error = error.__cause__
+    return False
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the Retry-After header of a rate-limited response, if any"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Refills `rate_per_minute` units per minute up to a burst of one minute's worth"""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = rate_per_minute
+        self.available = rate_per_minute
+        self.refill_rate = rate_per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.refill_rate
+
+    def take(self, amount: float):
+        # May go negative when actual usage exceeds the estimate; later calls wait it out
+        self.available -= amount
+
+
+class RateLimiter:
+    """
+    Process-wide limiter shared by every LLM call.
+
+    Requests and tokens per minute are enforced with token buckets. Concurrency is
+    adapted with AIMD: it grows by one call per window of successful calls and is
+    halved on a 429, when the provider's Retry-After pauses all callers. Transient
+    errors are retried with jittered exponential backoff.
+
+    State is guarded by a threading lock and waiting uses asyncio.sleep, so a single
+    limiter works across threads and event loops.
+    """
+
+    def __init__(self, config: dict):
+        limit_config = config.get('rate_limit', {})
+        self.requests = TokenBucket(limit_config.get('requests_per_minute', 120))
+        self.tokens = TokenBucket(limit_config.get('tokens_per_minute', 2000000))
+        self.max_concurrency = limit_config.get('max_concurrency', 32)
+        self.min_concurrency = limit_config.get('min_concurrency', 1)
+        self.concurrency_limit = float(limit_config.get('initial_concurrency', 8))
+        self.max_retries = limit_config.get('max_retries', 5)
+        self.backoff_base = limit_config.get('backoff_base', 1.0)
+        self.backoff_max = limit_config.get('backoff_max', 60.0)
+
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+        self.stats = {
+            "calls": 0,
+            "retries": 0,
+            "throttled": 0,
+            "failures": 0,
+            "queue_delay_total": 0.0,
+            "queue_delay_max": 0.0
+        }
+
+    def split(self, parts: int):
+        """
+        Keep only a 1/parts share of the limits, for one of `parts` worker processes
+        that together must stay within the configured rates
+        """
+        if parts <= 1:
+            return
+        with self._lock:
+            self.requests = TokenBucket(self.requests.capacity / parts)
+            self.tokens = TokenBucket(self.tokens.capacity / parts)
+            self.max_concurrency = max(1, self.max_concurrency // parts)
+            self.min_concurrency = min(self.min_concurrency, self.max_concurrency)
+            self.concurrency_limit = min(self.concurrency_limit, float(self.max_concurrency))
+
+    async def acquire(self, estimated_tokens: int) -> float:
+        """Wait for a concurrency slot and bucket capacity; returns the queueing delay"""
+        start = time.monotonic()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = max(self.paused_until - now, 0.0)
+                if not wait and self.in_flight >= int(self.concurrency_limit):
+                    wait = 0.05
+                if not wait:
+                    wait = max(self.requests.wait_time(1, now), self.tokens.wait_time(estimated_tokens, now))
+                if not wait:
+                    self.requests.take(1)
+                    self.tokens.take(estimated_tokens)
+                    self.in_flight += 1
+                    delay = now - start
+                    self.stats["queue_delay_total"] += delay
+                    self.stats["queue_delay_max"] = max(self.stats["queue_delay_max"], delay)
+                    return delay
+            await asyncio.sleep(min(wait, 1.0))
+
+    def release(self, estimated_tokens: int, actual_tokens: Optional[int] = None,
+                succeeded: bool = False, throttled: bool = False, retry_after: Optional[float] = None):
+        """Return a slot, correct the token estimate and adapt concurrency"""
+        with self._lock:
+            self.in_flight -= 1
+            if actual_tokens is not None:
+                self.tokens.take(actual_tokens - estimated_tokens)
+            if throttled:
+                # Multiplicative decrease, and pause everyone for Retry-After
+                self.stats["throttled"] += 1
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+                if retry_after:
+                    self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            elif succeeded:
+                # Additive increase: about +1 per window of successful calls
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+
+    def backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def call(self, fn: Callable[[], Awaitable[Any]], estimated_tokens: int,
+                   actual_tokens: Callable[[Any], Optional[int]] = lambda result: None) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Run `fn` under the limiter, retrying transient errors.
+        Returns the result and per-call stats (queue_delay, retries).
+        """
+        call_stats = {"queue_delay": 0.0, "retries": 0}
+        attempt = 0
+        while True:
+            call_stats["queue_delay"] += await self.acquire(estimated_tokens)
+            # The slot goes back however the attempt ends, cancellation included;
+            # only a success counts towards raising the concurrency limit
+            outcome = {}
+            try:
+                result = await fn()
+                outcome = {"succeeded": True, "actual_tokens": actual_tokens(result)}
+            except Exception as e:
+                outcome = {"throttled": isinstance(e, openai.RateLimitError), "retry_after": retry_after_seconds(e)}
+                if not is_transient(e) or attempt >= self.max_retries:
+                    with self._lock:
+                        self.stats["failures"] += 1
+                    raise
+            finally:
+                self.release(estimated_tokens, **outcome)
+
+            if outcome.get("succeeded"):
+                with self._lock:
+                    self.stats["calls"] += 1
+                return result, call_stats
+
+            delay = self.backoff(attempt, outcome["retry_after"])
+            attempt += 1
+            call_stats["retries"] = attempt
+            with self._lock:
+                self.stats["retries"] += 1
+            await asyncio.sleep(delay)
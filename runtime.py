@@ -0,0 +1,130 @@
+import os
+import asyncio
+import threading
+import weakref
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+import yaml
+from openai import AsyncOpenAI
+from tools import discover_tools
+from llm_cache import LLMCache
+from rate_limiter import RateLimiter
+from backends import create_backend
+
+# Background event loop that backs the synchronous API
+_sync_loop = None
+_sync_loop_lock = threading.Lock()
+
+# One runtime per config file, shared by every agent in the process
+_runtimes = {}
+_runtimes_lock = threading.Lock()
+
+
+def run_sync(coro):
+    """Run a coroutine on the shared background event loop and wait for its result"""
+    global _sync_loop
+    with _sync_loop_lock:
+        if _sync_loop is None or _sync_loop.is_closed():
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, name="agent-loop", daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _sync_loop).result()
+
+
+def freeze(value):
+    """Recursively convert parsed YAML into read-only mappings and tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def get_runtime(config_path: str = "config.yaml") -> "AgentRuntime":
+    """Get the process-wide runtime for a config file, creating it on first use"""
+    key = os.path.realpath(config_path)
+    with _runtimes_lock:
+        if key not in _runtimes:
+            _runtimes[key] = AgentRuntime(config_path)
+        return _runtimes[key]
+
+
+class AgentRuntime:
+    """
+    Process-wide state shared by all agents built from one config file:
+    the parsed config, the pooled keep-alive HTTP client and the tool registry.
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        # Parse configuration once; agents get a read-only view
+        with open(config_path, 'r') as f:
+            self.config = freeze(yaml.safe_load(f))
+        self.config_path = config_path
+
+        # Discover tools once and precompute their schemas
+        self.tools = discover_tools(self.config, silent=True)
+        self.tool_schemas = tuple(tool.to_openrouter_schema() for tool in self.tools.values())
+
+        # Blocking tools run on a bounded thread pool shared by all agents
+        agent_config = self.config.get('agent', {})
+        self.tool_executor = ThreadPoolExecutor(
+            max_workers=agent_config.get('tool_workers', 32),
+            thread_name_prefix="tool"
+        )
+        self.tool_concurrency = agent_config.get('tool_concurrency', {})
+        # Per event loop: {tool name: asyncio.Semaphore}
+        self._tool_semaphores = weakref.WeakKeyDictionary()
+
+        # Opt-in cache of LLM responses shared by all agents
+        self.llm_cache = LLMCache(self.config)
+
+        # Rate limiting and retries for every LLM call in the process
+        self.rate_limiter = RateLimiter(self.config)
+
+        # One AsyncOpenAI client (and connection pool) per event loop
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+        # Execution backend for orchestrated agents, created on first use
+        self._backend = None
+        self._backend_created = False
+
+    def client(self) -> AsyncOpenAI:
+        """Get the pooled OpenRouter client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            client = self._clients.get(loop)
+            if client is None:
+                client = AsyncOpenAI(
+                    base_url=self.config['openrouter']['base_url'],
+                    api_key=self.config['openrouter']['api_key'],
+                    max_retries=0  # Retries are handled by the shared RateLimiter
+                )
+                self._clients[loop] = client
+            return client
+
+    def execution_backend(self):
+        """Get the shared process-pool or queue backend, or None to run agents in-process"""
+        with self._lock:
+            if not self._backend_created:
+                self._backend = create_backend(self.config, self.config_path)
+                self._backend_created = True
+            return self._backend
+
+    def tool_semaphore(self, tool_name: str) -> asyncio.Semaphore:
+        """
+        Get the running loop's semaphore limiting concurrent runs of a tool. It is taken
+        before a call is handed to tool_executor, so calls waiting on one tool's limit
+        never occupy executor threads other tools need.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._tool_semaphores.setdefault(loop, {})
+            if tool_name not in semaphores:
+                limit = self.tool_concurrency.get(tool_name, self.tool_concurrency.get('default', 16))
+                semaphores[tool_name] = asyncio.Semaphore(limit)
+            return semaphores[tool_name]
+
+    def tool_mapping(self) -> Dict[str, Any]:
+        """Map tool names to their execute functions"""
+        return {name: tool.execute for name, tool in self.tools.items()}
@@ -0,0 +1,123 @@
+import time
+import asyncio
+import itertools
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+class _Waiter:
+    def __init__(self, query_id: Any, priority: int, seq: int, loop: asyncio.AbstractEventLoop):
+        self.query_id = query_id
+        self.priority = priority
+        self.seq = seq
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+class FairScheduler:
+    """
+    Global cap on in-flight LLM calls shared by many queries.
+
+    When a slot frees up it goes to the waiting call with the highest query priority;
+    among equal priorities, to the query with the fewest calls in flight (fair share),
+    then first come first served. Slots are granted under a threading lock and handed
+    to the waiter's own event loop, so one scheduler works across threads and loops.
+
+    Slots must be taken before anything else that queues calls (the rate limiter), or
+    waiters would line up there instead and priorities would never apply. `capacity`
+    optionally returns a lower, changing cap, e.g. the rate limiter's current
+    concurrency limit, so calls beyond what can run wait here in priority order.
+    """
+
+    def __init__(self, max_in_flight: int = 32, capacity: Optional[Callable[[], float]] = None):
+        self.max_in_flight = max_in_flight
+        self.capacity = capacity
+        self.in_flight = 0
+        self.per_query: Dict[Any, int] = defaultdict(int)
+        self._waiting = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {"granted": 0, "wait_total": 0.0, "wait_max": 0.0, "max_in_flight_seen": 0}
+
+    def for_query(self, query_id: Any, priority: int = 0) -> "QueryGate":
+        """Gate that agents of one query use to acquire slots"""
+        return QueryGate(self, query_id, priority)
+
+    async def acquire(self, query_id: Any, priority: int = 0) -> float:
+        """Wait for a slot; returns the time spent waiting"""
+        start = time.monotonic()
+        with self._lock:
+            waiter = _Waiter(query_id, priority, next(self._seq), asyncio.get_running_loop())
+            self._waiting.append(waiter)
+            self._grant()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    self._release(query_id)
+                else:
+                    self._waiting.remove(waiter)
+            raise
+
+        wait = time.monotonic() - start
+        with self._lock:
+            self.stats["wait_total"] += wait
+            self.stats["wait_max"] = max(self.stats["wait_max"], wait)
+        return wait
+
+    def release(self, query_id: Any):
+        with self._lock:
+            self._release(query_id)
+
+    def _release(self, query_id: Any):
+        self.in_flight -= 1
+        self.per_query[query_id] -= 1
+        if not self.per_query[query_id]:
+            del self.per_query[query_id]
+        self._grant()
+
+    def limit(self) -> int:
+        """Slots that may be in flight right now (at least one)"""
+        if self.capacity is None:
+            return self.max_in_flight
+        return max(1, min(self.max_in_flight, int(self.capacity())))
+
+    def _grant(self):
+        # Called with the lock held
+        limit = self.limit()
+        while self._waiting and self.in_flight < limit:
+            waiter = min(self._waiting, key=lambda w: (-w.priority, self.per_query[w.query_id], w.seq))
+            self._waiting.remove(waiter)
+            waiter.granted = True
+            self.in_flight += 1
+            self.per_query[waiter.query_id] += 1
+            self.stats["granted"] += 1
+            self.stats["max_in_flight_seen"] = max(self.stats["max_in_flight_seen"], self.in_flight)
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class QueryGate:
+    """Slots of a FairScheduler acquired on behalf of one query"""
+
+    def __init__(self, scheduler: FairScheduler, query_id: Any, priority: int = 0):
+        self.scheduler = scheduler
+        self.query_id = query_id
+        self.priority = priority
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold one in-flight LLM call slot for the enclosed block; yields the wait time"""
+        wait = await self.scheduler.acquire(self.query_id, self.priority)
+        try:
+            yield wait
+        finally:
+            self.scheduler.release(self.query_id)
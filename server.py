@@ -0,0 +1,267 @@
+import sys
+import json
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from runtime import get_runtime
+from orchestrator import TaskOrchestrator
+from scheduler import FairScheduler
+
+
+class QueueFullError(Exception):
+    """Too many jobs are already waiting"""
+
+
+class Job:
+    """One submitted query: its status, result and the event log replayed to SSE clients"""
+
+    def __init__(self, query: str, priority: int = 0):
+        self.id = uuid.uuid4().hex[:12]
+        self.query = query
+        self.priority = priority
+        self.status = "queued"
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.run_stats: Dict[str, Any] = {}
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.events: List[Dict[str, Any]] = []
+        self._changed = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def add_event(self, event: Dict[str, Any]):
+        self.events.append(event)
+        self._changed.set()
+
+    def finish(self, status: str):
+        """
+        Record the outcome and its final event, then merge the streamed token events into
+        one so finished jobs keep a small log. The merged log is a new list: SSE readers
+        still following the old one finish replaying it unchanged.
+        """
+        self.status = status
+        self.finished_at = time.time()
+        self.add_event({"type": status, "time": self.finished_at, "result": self.result, "error": self.error})
+        events = []
+        for event in self.events:
+            if event["type"] == "token" and events and events[-1]["type"] == "token":
+                events[-1] = {"type": "token", "text": events[-1]["text"] + event["text"]}
+            else:
+                events.append(event)
+        self.events = events
+
+    async def wait_for_events(self, seen: int):
+        """Wait until there are events past index `seen` or the job finished"""
+        while len(self.events) <= seen and not self.finished:
+            self._changed.clear()
+            await self._changed.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "query": self.query,
+            "priority": self.priority,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "run_stats": self.run_stats
+        }
+
+
+class JobManager:
+    """
+    Runs submitted jobs on the server's event loop against the warm shared runtime.
+    At most max_concurrent_jobs run at once; LLM calls of all jobs share one
+    FairScheduler so higher-priority jobs get slots first.
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        self.config_path = config_path
+        self.runtime = get_runtime(config_path)
+        server_config = self.runtime.config.get('server', {})
+        self.max_concurrent_jobs = server_config.get('max_concurrent_jobs', 4)
+        self.max_queued_jobs = server_config.get('max_queued_jobs', 100)
+        self.max_finished_jobs = server_config.get('max_finished_jobs', 200)
+        self.scheduler = FairScheduler(
+            server_config.get('max_in_flight_llm_calls', 32),
+            capacity=lambda: self.runtime.rate_limiter.concurrency_limit
+        )
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._slots = None
+        # Running job tasks; the event loop only keeps weak references to tasks
+        self._tasks = set()
+
+    def submit(self, query: str, priority: int = 0) -> Job:
+        queued = sum(1 for job in self.jobs.values() if job.status == "queued")
+        if queued >= self.max_queued_jobs:
+            raise QueueFullError(f"{queued} jobs already queued")
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent_jobs)
+
+        job = Job(query, priority)
+        self.jobs[job.id] = job
+        self._prune()
+        task = asyncio.ensure_future(self._run(job))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished_jobs"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(len(finished) - self.max_finished_jobs, 0)]:
+            del self.jobs[job_id]
+
+    async def _run(self, job: Job):
+        async with self._slots:
+            job.status = "running"
+            job.started_at = time.time()
+            job.add_event({"type": "running", "time": job.started_at})
+
+            orchestrator = None
+            try:
+                orchestrator = TaskOrchestrator(config_path=self.config_path, silent=True)
+                orchestrator.llm_gate = self.scheduler.for_query(job.id, job.priority)
+                orchestrator.on_event = job.add_event
+                job.result = await orchestrator.orchestrate_async(
+                    job.query, on_token=lambda token: job.add_event({"type": "token", "text": token})
+                )
+                status = "completed"
+            except Exception as e:
+                job.error = str(e)
+                status = "failed"
+            if orchestrator is not None:
+                job.run_stats = orchestrator.run_stats
+            job.finish(status)
+
+
+def sse_format(event: Dict[str, Any]) -> bytes:
+    return f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n".encode("utf-8")
+
+
+class OrchestratorApp:
+    """
+    Minimal ASGI application:
+      POST /jobs              {"query": ..., "priority": 0} -> 202 with the job id
+      GET  /jobs/{id}         job status, result and run statistics
+      GET  /jobs/{id}/events  server-sent events: agent progress, tokens, completion
+      GET  /health            queue and scheduler state
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        self.manager = JobManager(config_path)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        parts = [part for part in scope["path"].split("/") if part]
+
+        if method == "POST" and parts == ["jobs"]:
+            await self._submit(receive, send)
+        elif method == "GET" and parts == ["health"]:
+            await self._json(send, 200, {
+                "status": "ok",
+                "jobs": {status: sum(1 for job in self.manager.jobs.values() if job.status == status)
+                         for status in ("queued", "running", "completed", "failed")},
+                "llm_in_flight": self.manager.scheduler.in_flight
+            })
+        elif method == "GET" and len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.manager.jobs.get(parts[1])
+            if job is None:
+                await self._json(send, 404, {"error": "Unknown job"})
+            elif len(parts) == 2:
+                await self._json(send, 200, job.to_dict())
+            elif parts[2] == "events":
+                await self._stream_events(send, job)
+            else:
+                await self._json(send, 404, {"error": "Not found"})
+        else:
+            await self._json(send, 404, {"error": "Not found"})
+
+    async def _submit(self, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        try:
+            payload = json.loads(body or b"{}")
+            query = payload["query"]
+            if not isinstance(query, str) or not query.strip():
+                raise ValueError("query must be a non-empty string")
+            job = self.manager.submit(query, int(payload.get("priority", 0)))
+        except QueueFullError as e:
+            await self._json(send, 503, {"error": str(e)})
+            return
+        except (ValueError, KeyError, TypeError) as e:
+            await self._json(send, 400, {"error": f"Invalid request: {e}"})
+            return
+        await self._json(send, 202, {"id": job.id, "status": job.status,
+                                     "events": f"/jobs/{job.id}/events", "result": f"/jobs/{job.id}"})
+
+    async def _stream_events(self, send, job: Job):
+        """Replay the job's events so far, then follow new ones until it finishes"""
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")]
+        })
+        # Follow the log as it was when the stream started; finishing replaces job.events
+        events = job.events
+        seen = 0
+        while True:
+            await job.wait_for_events(seen)
+            while seen < len(events):
+                await send({"type": "http.response.body", "body": sse_format(events[seen]), "more_body": True})
+                seen += 1
+            if job.finished:
+                break
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    @staticmethod
+    async def _json(send, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def main():
+    """Serve the orchestrator over HTTP (requires uvicorn)"""
+    try:
+        import uvicorn
+    except ImportError:
+        print("The HTTP service needs uvicorn: pip install uvicorn")
+        sys.exit(1)
+
+    config_path = sys.argv[1] if len(sys.argv) > 1 else "config.yaml"
+    app = OrchestratorApp(config_path)
+    server_config = app.manager.runtime.config.get('server', {})
+    uvicorn.run(app, host=server_config.get('host', '127.0.0.1'), port=server_config.get('port', 8000))
+
+
+if __name__ == "__main__":
+    main()
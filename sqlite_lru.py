@@ -0,0 +1,102 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class SQLiteLRU:
+    """
+    A SQLite table of entries with a byte size, capped at max_bytes by evicting the least
+    recently used entries first. Shared by the on-disk caches (LLM responses, page text).
+
+    Rows have a TEXT primary key `key`, the given extra columns, `size` and `accessed_at`.
+    The database is opened on first use; one connection is shared under a lock, so
+    calls are blocking and thread-safe (keep them off the event loop).
+    """
+
+    def __init__(self, path: str, table: str, columns: Dict[str, str], max_bytes: int):
+        self.path = path
+        self.table = table
+        self.columns = columns
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            column_sql = "".join(f"{name} {kind}, " for name, kind in self.columns.items())
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"key TEXT PRIMARY KEY, {column_sql}size INTEGER NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.commit()
+        return self._db
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """The entry's columns, marking it as recently used; None if absent"""
+        names = list(self.columns)
+        with self._lock:
+            db = self._connect()
+            row = db.execute(f"SELECT {', '.join(names)} FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            db.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+            return dict(zip(names, row))
+
+    def put(self, key: str, size: int, **values) -> List[str]:
+        """Insert or replace an entry, then evict down to max_bytes; returns the evicted keys"""
+        names = list(values)
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, {''.join(name + ', ' for name in names)}size, accessed_at) "
+                f"VALUES ({', '.join('?' * (len(names) + 3))})",
+                (key, *values.values(), size, time.time())
+            )
+            evicted = self._evict(db)
+            db.commit()
+            return evicted
+
+    def update(self, key: str, **values):
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                f"UPDATE {self.table} SET {', '.join(name + ' = ?' for name in values)} WHERE key = ?",
+                (*values.values(), key)
+            )
+            db.commit()
+
+    def delete(self, key: str):
+        with self._lock:
+            db = self._connect()
+            db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            db.commit()
+
+    def delete_older(self, column: str, before: float) -> List[str]:
+        """Delete entries whose `column` is earlier than `before` (expiry); returns their keys"""
+        with self._lock:
+            db = self._connect()
+            keys = [row[0] for row in db.execute(f"SELECT key FROM {self.table} WHERE {column} < ?", (before,))]
+            db.execute(f"DELETE FROM {self.table} WHERE {column} < ?", (before,))
+            db.commit()
+            return keys
+
+    def _evict(self, db: sqlite3.Connection) -> List[str]:
+        """Drop least recently used entries until under max_bytes"""
+        total = db.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        evicted = []
+        if total <= self.max_bytes:
+            return evicted
+        for key, size in db.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            db.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            evicted.append(key)
+            total -= size
+        return evicted
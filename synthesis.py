@@ -0,0 +1,109 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional
+from context_manager import count_text_tokens
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to roughly max_tokens, keeping the beginning"""
+    tokens = count_text_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    return text[:int(len(text) * max_tokens / tokens)] + "\n[...truncated]"
+
+
+class TreeSynthesizer:
+    """
+    Map-reduce synthesis that merges agent responses as they finish.
+
+    Texts are kept per tree level: agent responses are level 0 and a merge of level-k
+    texts is level k+1. While agents are still running, every `fan_in` texts of the same
+    level are merged in the background, so the tree stays balanced however responses
+    arrive. Once the last agent is done (or the rest are cut), finish() waits for
+    in-flight merges, reduces the leftovers level by level until at most `fan_in`
+    remain, and always runs the final merge over them with the synthesis prompt, even
+    when a single text is left. Every merge input is capped at `max_input_tokens`,
+    split evenly between the texts being merged.
+
+    merge(texts, final, on_token) does the actual LLM call and returns the merged text.
+    """
+
+    def __init__(self, merge: Callable[..., Awaitable[str]], expected: int,
+                 fan_in: int = 2, max_input_tokens: int = 12000):
+        self.merge = merge
+        self.expected = expected
+        self.fan_in = max(2, fan_in)
+        self.max_input_tokens = max_input_tokens
+        self.received = 0
+        self.closed = False
+        self.levels: Dict[int, List[str]] = {}
+        self.in_flight = set()
+        self.stats = {
+            "merges": 0,
+            "depth": 0,
+            "max_merge_input_tokens": 0,
+            "final_merge_inputs": 0,
+            "final_prompt_tokens": 0
+        }
+
+    def add(self, response: Optional[str]):
+        """Record one finished agent; None marks an agent that produced no usable response"""
+        if self.closed:
+            return
+        self.received += 1
+        if response:
+            self._offer(response, 0)
+
+    def _offer(self, text: str, level: int):
+        ready = self.levels.setdefault(level, [])
+        ready.append(text)
+        # Merge only while stragglers are outstanding; the rest goes to finish()
+        while not self.closed and self.received < self.expected and len(ready) >= self.fan_in:
+            batch = [ready.pop(0) for _ in range(self.fan_in)]
+            self.in_flight.add(asyncio.ensure_future(self._merge(batch, level)))
+
+    def _fit(self, texts: List[str]) -> List[str]:
+        budget = max(1, self.max_input_tokens // len(texts))
+        return [truncate_tokens(text, budget) for text in texts]
+
+    async def _merge(self, batch: List[str], level: int):
+        inputs = self._fit(batch)
+        tokens = sum(count_text_tokens(text) for text in inputs)
+        self.stats["merges"] += 1
+        self.stats["depth"] = max(self.stats["depth"], level + 1)
+        self.stats["max_merge_input_tokens"] = max(self.stats["max_merge_input_tokens"], tokens)
+        self._offer(await self.merge(inputs, final=False), level + 1)
+
+    def _remaining(self) -> int:
+        return sum(len(texts) for texts in self.levels.values())
+
+    async def finish(self, on_token=None) -> Optional[str]:
+        """Wait for in-flight merges, reduce the leftovers and run the final merge, streaming it to on_token"""
+        self.closed = True
+        while self.in_flight:
+            done, _ = await asyncio.wait(self.in_flight)
+            self.in_flight -= done
+            for task in done:
+                # Merge errors are handled by the merge function; re-raise anything else
+                task.result()
+
+        # Leftovers of the lowest level are merged together (a lone one moves up a level)
+        # until the final merge has at most fan_in inputs
+        while self._remaining() > self.fan_in:
+            level = min(level for level, texts in self.levels.items() if texts)
+            texts = self.levels.pop(level)
+            if len(texts) == 1:
+                self.levels.setdefault(level + 1, []).extend(texts)
+                continue
+            batches = [texts[i:i + self.fan_in] for i in range(0, len(texts), self.fan_in)]
+            if len(batches[-1]) == 1:
+                self.levels.setdefault(level + 1, []).extend(batches.pop())
+            await asyncio.gather(*(self._merge(batch, level) for batch in batches))
+
+        remaining = [text for level in sorted(self.levels) for text in self.levels[level]]
+        if not remaining:
+            return None
+
+        inputs = self._fit(remaining)
+        self.stats["final_merge_inputs"] = len(inputs)
+        self.stats["final_prompt_tokens"] = sum(count_text_tokens(text) for text in inputs)
+        return await self.merge(inputs, final=True, on_token=on_token)
@@ -0,0 +1,81 @@
+import sys
+import os
+import json
+import asyncio
+
+# Add repository root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context_manager import ContextManager, SUMMARY_NAME
+
+
+def conversation(turns, output_chars=4000):
+    """System and user messages followed by tool-calling turns with bulky search results"""
+    messages = [{"role": "system", "content": "You are an agent."}, {"role": "user", "content": "Research X"}]
+    for turn in range(turns):
+        call_id = f"call_{turn}"
+        messages.append({"role": "assistant", "content": f"Searching {turn}", "tool_calls": [
+            {"id": call_id, "type": "function", "function": {"name": "search_web", "arguments": json.dumps({"query": f"x {turn}"})}}
+        ]})
+        results = [{"title": f"Result {turn}", "url": f"https://example.com/{turn}",
+                    "snippet": "fact " * 40, "content": "page text " * (output_chars // 10)}]
+        messages.append({"role": "tool", "tool_call_id": call_id, "name": "search_web", "content": json.dumps(results)})
+    return messages
+
+
+def manager(policies, max_prompt_tokens, summarizer=None):
+    config = {"context": {"max_prompt_tokens": max_prompt_tokens, "keep_recent_turns": 2, "policies": policies}}
+    return ContextManager(config, summarizer=summarizer)
+
+
+class TestContextManager:
+    """Test ContextManager.fit and the tokens each policy saves"""
+
+    def test_under_budget_is_untouched(self):
+        messages = conversation(3)
+        context = manager(["key_facts"], 10 ** 6)
+        assert asyncio.run(context.fit(messages)) is messages
+        assert all(entry["applied"] == 0 for entry in context.stats.values())
+
+    def test_key_facts_shrinks_old_tool_outputs_only(self):
+        """Old search results keep title, URL and snippet; the recent turns stay verbatim"""
+        messages = conversation(5)
+        context = manager(["key_facts"], 2500)
+        before = context.count_tokens(messages)
+        fitted = asyncio.run(context.fit(messages))
+
+        assert len(fitted) == len(messages)
+        assert [m.get("tool_call_id") for m in fitted] == [m.get("tool_call_id") for m in messages]
+        old_outputs = [m["content"] for m in fitted[:-4] if m["role"] == "tool"]
+        assert all(json.loads(content)["key_facts"].startswith("Result") for content in old_outputs)
+        assert fitted[-4:] == messages[-4:]
+        assert context.stats["key_facts"] == {"applied": 1, "tokens_saved": before - context.count_tokens(fitted)}
+        assert context.count_tokens(fitted) <= 2500
+
+    def test_policies_escalate_until_the_budget_fits(self):
+        """Each policy that runs records its own savings; later ones only run when still over budget"""
+        async def summarizer(prompt):
+            return "short summary"
+
+        messages = conversation(6)
+        context = manager(["key_facts", "elide_tool_outputs", "summarize"], 1, summarizer)
+        fitted = asyncio.run(context.fit(messages))
+
+        assert all(context.stats[policy]["applied"] == 1 for policy in ContextManager.POLICIES)
+        assert all(context.stats[policy]["tokens_saved"] > 0 for policy in ContextManager.POLICIES)
+        saved = sum(entry["tokens_saved"] for entry in context.stats.values())
+        assert saved == context.count_tokens(messages) - context.count_tokens(fitted)
+
+        summary = [m for m in fitted if m.get("name") == SUMMARY_NAME]
+        assert len(summary) == 1 and summary[0]["content"].endswith("short summary")
+        assert fitted[-4:] == messages[-4:]
+
+    def test_summarize_falls_back_when_summarizer_fails(self):
+        """A failing summarizer leaves an extractive summary instead of raising"""
+        async def summarizer(prompt):
+            raise RuntimeError("down")
+
+        context = manager(["summarize"], 1000, summarizer)
+        fitted = asyncio.run(context.fit(conversation(4)))
+        summary = [m for m in fitted if m.get("name") == SUMMARY_NAME]
+        assert len(summary) == 1 and "[assistant] Searching 0" in summary[0]["content"]
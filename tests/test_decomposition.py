@@ -0,0 +1,142 @@
+import sys
+import os
+import asyncio
+from unittest.mock import Mock
+
+import openai
+
+# Add repository root to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from decomposition import IncrementalArrayParser, parse_subtasks, complete_subtasks, fallback_subtasks
+from orchestrator import TaskOrchestrator
+
+
+def feed_in_chunks(parser, text, size):
+    """Feed text in fixed-size fragments, collecting what each call completes"""
+    completed = []
+    for start in range(0, len(text), size):
+        completed.extend(parser.feed(text[start:start + size]))
+    return completed
+
+
+class TestIncrementalArrayParser:
+    """Test IncrementalArrayParser on streamed model output"""
+
+    def test_items_complete_across_fragments(self):
+        """Questions split over many fragments come out whole, in order"""
+        text = 'Sure! ```json\n["What is A?", "Why \\"B\\"?", "How [C]?"]\n```'
+        parser = IncrementalArrayParser()
+        completed = feed_in_chunks(parser, text, 3)
+        assert completed == ["What is A?", 'Why "B"?', "How [C]?"]
+        assert parser.items == completed
+        assert parser.done
+
+    def test_wrapping_object_and_non_string_arrays(self):
+        """The array inside {"questions": [...]} is found; arrays without strings are skipped"""
+        parser = IncrementalArrayParser()
+        parser.feed('Step [1] done. {"questions": ["Q1", "Q2"]} and ["later"]')
+        assert parser.items == ["Q1", "Q2"]
+
+    def test_blank_items_are_stripped_and_dropped(self):
+        """Streamed questions are cleaned the same way as parse_subtasks cleans them"""
+        parser = IncrementalArrayParser()
+        completed = feed_in_chunks(parser, '["  Q1 ", "", "   ", "Q2\\n"]', 2)
+        assert completed == ["Q1", "Q2"]
+        assert parser.items == completed
+        assert parse_subtasks('["  Q1 ", "", "   ", "Q2\\n"]') == completed
+
+
+class TestParseSubtasks:
+    """Test parse_subtasks on the formats models answer with"""
+
+    def test_json_array_and_object(self):
+        assert parse_subtasks('["A?", "B?"]') == ["A?", "B?"]
+        assert parse_subtasks('{"questions": [" A? ", "B?"]}') == ["A?", "B?"]
+        assert parse_subtasks('{"items": ["A?"]}') == ["A?"]
+
+    def test_code_fence_and_embedded_json(self):
+        assert parse_subtasks('```json\n["A?", "B?"]\n```') == ["A?", "B?"]
+        assert parse_subtasks('Here you go: ["A?", "B?"] Hope it helps.') == ["A?", "B?"]
+
+    def test_numbered_and_bulleted_lists(self):
+        assert parse_subtasks("1. What is A?\n2. What is B?") == ["What is A?", "What is B?"]
+        assert parse_subtasks("Questions:\n- A\n* B") == ["A", "B"]
+
+    def test_empty_output(self):
+        assert parse_subtasks("") == []
+        assert parse_subtasks(None) == []
+
+
+class TestCompleteSubtasks:
+    """Test complete_subtasks trimming and padding to the agent count"""
+
+    def test_exactly_num_agents_is_unchanged(self):
+        """A full list is returned as is, without touching the fallbacks"""
+        questions = ["A?", "B?", "C?", "D?"]
+        assert complete_subtasks(questions, "topic", 4) == questions
+
+    def test_long_list_is_trimmed(self):
+        assert complete_subtasks(["A?", "B?", "C?"], "topic", 2) == ["A?", "B?"]
+
+    def test_short_list_is_padded_with_distinct_fallbacks(self):
+        fallbacks = fallback_subtasks("topic", 4)
+        result = complete_subtasks(["A?", fallbacks[0]], "topic", 4)
+        assert result == ["A?", fallbacks[0], fallbacks[1], fallbacks[2]]
+
+    def test_fallbacks_cover_more_agents_than_angles(self):
+        result = complete_subtasks([], "topic", 10)
+        assert len(result) == 10
+        assert len(set(result)) == 10
+
+
+def bad_request(message):
+    response = Mock(status_code=400, headers={})
+    return openai.BadRequestError(message, response=response, body=None)
+
+
+class StubAgent:
+    """Decomposition agent answering from a script: an exception is raised, text is streamed"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.formats = []
+
+    async def complete(self, prompt, on_token=None, response_format=None):
+        self.formats.append((response_format or {}).get("type"))
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        for start in range(0, len(reply), 5):
+            on_token(reply[start:start + 5])
+        return reply
+
+
+class TestDecomposeTask:
+    """Test TaskOrchestrator.decompose_task_async with a scripted model"""
+
+    def decompose(self, replies, num_agents, on_subtask=None):
+        orchestrator = TaskOrchestrator(config_path=os.path.join(ROOT, "config.yaml"), silent=True)
+        agent = StubAgent(replies)
+        orchestrator._new_agent = lambda phase: agent
+        subtasks = asyncio.run(orchestrator.decompose_task_async("topic", num_agents, on_subtask=on_subtask))
+        return subtasks, agent.formats, orchestrator.run_stats["decomposition"]
+
+    def test_rejected_format_falls_back_to_the_next(self):
+        dispatched = []
+        subtasks, formats, stats = self.decompose(
+            [bad_request("json_schema not supported"), '{"questions": ["A?", " ", "B?"]}'], 2,
+            on_subtask=lambda index, question: dispatched.append((index, question))
+        )
+        assert subtasks == ["A?", "B?"]
+        assert dispatched == [(0, "A?"), (1, "B?")]
+        assert formats == ["json_schema", "json_object"]
+        assert stats["response_format"] == "json_object" and len(stats["errors"]) == 1
+
+    def test_failed_call_still_yields_num_agents_subtasks(self):
+        """A model that is down leaves exactly num_agents fallback questions"""
+        subtasks, formats, stats = self.decompose([RuntimeError("down")], 8)
+        assert subtasks == fallback_subtasks("topic", 8)
+        assert formats == ["json_schema"]
+        assert stats["generated"] == 0
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add repository root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_cache import LLMCache, make_key
+
+
+def request(call_id, content="Paris is the capital.", temperature=0.7):
+    """A two-turn tool-calling request whose tool call carries the given id"""
+    return {
+        "model": "test/model",
+        "temperature": temperature,
+        "messages": [
+            {"role": "user", "content": "What is the capital of France?"},
+            {"role": "assistant", "content": None, "tool_calls": [
+                {"id": call_id, "type": "function", "function": {"name": "search_web", "arguments": '{"query": "capital of France"}'}}
+            ]},
+            {"role": "tool", "tool_call_id": call_id, "name": "search_web", "content": content}
+        ],
+        "tools": [{"type": "function", "function": {"name": "search_web"}}]
+    }
+
+
+class TestMakeKey:
+    """Test make_key content-addressing of requests"""
+
+    def test_tool_call_ids_do_not_change_the_key(self):
+        """Ids generated per run map to the same positional ids"""
+        assert make_key(request("call_abc123")) == make_key(request("toolu_xyz789"))
+
+    def test_content_and_params_change_the_key(self):
+        assert make_key(request("call_1")) != make_key(request("call_1", content="Lyon is the capital."))
+        assert make_key(request("call_1")) != make_key(request("call_1", temperature=0.0))
+
+
+class TestLLMCache:
+    """Test LLMCache tiers and TTL"""
+
+    def cache(self, tmp_path, **options):
+        return LLMCache({"llm_cache": {"mode": "read_write", "path": str(tmp_path / "cache.sqlite"), **options}})
+
+    def test_disk_tier_survives_a_new_instance(self, tmp_path):
+        key = make_key(request("call_1"))
+        self.cache(tmp_path).put(key, {"content": "Paris"})
+
+        cache = self.cache(tmp_path)
+        assert cache.get(key) == {"content": "Paris"}
+        assert cache.stats["disk_hits"] == 1
+        assert cache.get(key) == {"content": "Paris"}
+        assert cache.stats["memory_hits"] == 1
+
+    def test_expired_entries_miss(self, tmp_path):
+        cache = self.cache(tmp_path, ttl=-1)
+        cache.put("key", {"content": "Paris"})
+        assert cache.get("key") is None
+        assert cache.stats["misses"] == 1
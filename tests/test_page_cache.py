@@ -0,0 +1,114 @@
+import sys
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add repository root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools import _page_cache
+from tools._page_cache import PageCache, normalize_url
+from tools.search_tool import SearchTool
+
+
+class TestNormalizeUrl:
+    """Test normalize_url canonical forms"""
+
+    def test_case_port_fragment_and_tracking_params(self):
+        assert normalize_url(" HTTPS://Example.COM:443/a?b=2&utm_source=x&a=1#frag") == "https://example.com/a?a=1&b=2"
+        assert normalize_url("http://example.com:8080/a?fbclid=1") == "http://example.com:8080/a"
+
+    def test_empty_path_and_path_case(self):
+        assert normalize_url("http://example.com") == "http://example.com/"
+        assert normalize_url("http://example.com/Page") != normalize_url("http://example.com/page")
+
+
+class TestPageCache:
+    """Test PageCache TTL, revalidation and eviction"""
+
+    def test_fresh_within_ttl(self, tmp_path):
+        cache = PageCache(str(tmp_path / "pages.sqlite"), ttl=3600)
+        assert cache.get("https://example.com/a") is None
+        cache.put("https://example.com/a#top", "text", etag='"v1"')
+        entry = cache.get("https://EXAMPLE.com/a?utm_medium=x")
+        assert entry == {"text": "text", "etag": '"v1"', "last_modified": None, "fresh": True}
+        assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    def test_stale_entry_keeps_validators_until_revalidated(self, tmp_path, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(_page_cache.time, "time", lambda: now[0])
+        cache = PageCache(str(tmp_path / "pages.sqlite"), ttl=60)
+        cache.put("https://example.com/a", "text", etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+
+        now[0] += 61
+        entry = cache.get("https://example.com/a")
+        assert not entry["fresh"] and entry["etag"] == '"v1"'
+
+        cache.revalidated("https://example.com/a")
+        assert cache.get("https://example.com/a")["fresh"]
+        now[0] += 61
+        assert not cache.get("https://example.com/a")["fresh"]
+        assert cache.stats["revalidated"] == 1
+
+    def test_least_recently_used_pages_are_evicted(self, tmp_path):
+        cache = PageCache(str(tmp_path / "pages.sqlite"), max_bytes=250)
+        for page in range(3):
+            cache.put(f"https://example.com/{page}", "x" * 100)
+        assert cache.get("https://example.com/0") is None
+        assert cache.get("https://example.com/2") is not None
+        assert cache.stats["evictions"] == 1
+
+
+class TestSearchToolPageCache:
+    """Test SearchTool page fetches against a local server with an ETag"""
+
+    def setup_method(self):
+        self.requests = []
+        requests = self.requests
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                requests.append(self.headers.get("If-None-Match"))
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self.send_response(304)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = ("<html><body>" + "<p>Cached page text.</p>" * 20 + "</body></html>").encode()
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/page"
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def search_tool(self, path, ttl):
+        return SearchTool({"search": {"page_cache": {"path": path, "ttl": ttl}}})
+
+    def test_hit_within_ttl_then_304_revalidation(self, tmp_path):
+        path = str(tmp_path / "pages.sqlite")
+        tool = self.search_tool(path, 3600)
+        text = tool.fetch_page_text(self.url)
+        assert "Cached page text." in text
+        assert tool.fetch_page_text(self.url + "?utm_source=feed") == text
+        assert self.requests == [None]
+        assert tool.stats["cache_hits"] == 1
+
+        # Past the TTL the page is revalidated with its ETag; the 304 reuses the cached text
+        stale = self.search_tool(path, 0)
+        assert stale.fetch_page_text(self.url) == text
+        assert self.requests == [None, '"v1"']
+        assert stale.stats["revalidated"] == 1 and stale.stats["bytes_downloaded"] == 0
@@ -0,0 +1,30 @@
+import sys
+import os
+
+# Add repository root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import RunHistory
+
+
+class TestRunHistory:
+    """Test RunHistory bounding the file to the most recent runs"""
+
+    def test_file_is_compacted_to_max_runs(self, tmp_path):
+        """Recording past max_runs keeps only the most recent runs on disk"""
+        path = str(tmp_path / "history.jsonl")
+        history = RunHistory(path, max_runs=3)
+        for run in range(7):
+            history.record({"run": run})
+
+        assert [run["run"] for run in history.load()] == [4, 5, 6]
+        with open(path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 3
+
+    def test_load_skips_corrupt_lines(self, tmp_path):
+        """A truncated line is ignored instead of failing the plan"""
+        path = str(tmp_path / "history.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"run": 0}\n{"run": \n{"run": 1}\n')
+
+        assert RunHistory(path, max_runs=10).load() == [{"run": 0}, {"run": 1}]
@@ -0,0 +1,99 @@
+import sys
+import os
+import asyncio
+from unittest.mock import Mock
+
+import openai
+
+# Add repository root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import RateLimiter
+
+
+def server_error():
+    response = Mock(status_code=500, headers={})
+    return openai.InternalServerError("boom", response=response, body=None)
+
+
+class TestRateLimiter:
+    """Test RateLimiter slot accounting and AIMD concurrency"""
+
+    def test_cancelled_call_releases_its_slot(self):
+        """A call cancelled while fn is running must give its slot back"""
+        limiter = RateLimiter({"rate_limit": {"initial_concurrency": 1}})
+
+        async def scenario():
+            started = asyncio.Event()
+
+            async def hang():
+                started.set()
+                await asyncio.sleep(3600)
+
+            task = asyncio.create_task(limiter.call(hang, estimated_tokens=10))
+            await started.wait()
+            assert limiter.in_flight == 1
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+            assert limiter.in_flight == 0
+
+            # The freed slot is usable again
+            async def ok():
+                return "ok"
+            result, _ = await asyncio.wait_for(limiter.call(ok, estimated_tokens=10), timeout=5)
+            return result
+
+        assert asyncio.run(scenario()) == "ok"
+        assert limiter.in_flight == 0
+
+    def test_only_successes_raise_concurrency(self):
+        """Failed and retried attempts must not count as additive increase"""
+        limiter = RateLimiter({"rate_limit": {"initial_concurrency": 4, "max_retries": 0}})
+
+        async def fail():
+            raise server_error()
+
+        try:
+            asyncio.run(limiter.call(fail, estimated_tokens=10))
+        except openai.InternalServerError:
+            pass
+        assert limiter.concurrency_limit == 4
+        assert limiter.in_flight == 0
+        assert limiter.stats["failures"] == 1
+
+        async def ok():
+            return "ok"
+        asyncio.run(limiter.call(ok, estimated_tokens=10))
+        assert limiter.concurrency_limit == 4.25
+        assert limiter.stats["calls"] == 1
+
+    def test_transient_error_is_retried(self):
+        """A 5xx is retried and the retry reuses a fresh slot"""
+        limiter = RateLimiter({"rate_limit": {"initial_concurrency": 2, "backoff_base": 0.0}})
+        attempts = []
+
+        async def flaky():
+            attempts.append(limiter.in_flight)
+            if len(attempts) == 1:
+                raise server_error()
+            return "ok"
+
+        result, call_stats = asyncio.run(limiter.call(flaky, estimated_tokens=10))
+        assert result == "ok"
+        assert call_stats["retries"] == 1
+        assert attempts == [1, 1]
+        assert limiter.in_flight == 0
+
+    def test_split_shares_limits_between_workers(self):
+        """Each of N worker processes keeps 1/N of the rates and concurrency"""
+        limiter = RateLimiter({"rate_limit": {"requests_per_minute": 120, "tokens_per_minute": 1000,
+                                              "initial_concurrency": 8, "max_concurrency": 32}})
+        limiter.split(4)
+
+        assert limiter.requests.capacity == 30
+        assert limiter.tokens.capacity == 250
+        assert limiter.max_concurrency == 8
+        assert limiter.concurrency_limit == 8
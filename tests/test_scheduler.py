@@ -0,0 +1,59 @@
+import sys
+import os
+import asyncio
+
+# Add repository root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import FairScheduler
+from rate_limiter import RateLimiter
+
+
+async def run_calls(scheduler, calls, hold=0.01, call=None):
+    """Start every (query_id, priority) call while one slot is held; returns the grant order"""
+    granted = []
+    blocker = scheduler.for_query("blocker")
+
+    async def one(query_id, priority):
+        async with scheduler.for_query(query_id, priority).slot():
+            granted.append(query_id)
+            if call is not None:
+                await call()
+            await asyncio.sleep(hold)
+
+    async with blocker.slot():
+        tasks = [asyncio.create_task(one(query_id, priority)) for query_id, priority in calls]
+        for _ in range(5):
+            await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    return granted
+
+
+class TestFairScheduler:
+    """Test FairScheduler grant order"""
+
+    def test_higher_priority_query_granted_first(self):
+        """Calls of a priority-5 query overtake earlier calls of a priority-0 query"""
+        scheduler = FairScheduler(max_in_flight=1)
+        calls = [("low", 0), ("low", 0), ("high", 5), ("high", 5)]
+
+        granted = asyncio.run(run_calls(scheduler, calls))
+        assert granted == ["high", "high", "low", "low"]
+        assert scheduler.in_flight == 0
+
+    def test_capacity_follows_rate_limiter(self):
+        """With a limiter allowing one call, queries wait at the scheduler by priority"""
+        limiter = RateLimiter({"rate_limit": {"initial_concurrency": 1, "max_concurrency": 1}})
+        scheduler = FairScheduler(max_in_flight=32, capacity=lambda: limiter.concurrency_limit)
+        calls = [("low", 0), ("low", 0), ("high", 5), ("high", 5)]
+
+        async def llm_call():
+            async def fn():
+                await asyncio.sleep(0.01)
+                return "ok"
+            await limiter.call(fn, estimated_tokens=10)
+
+        granted = asyncio.run(run_calls(scheduler, calls, hold=0, call=llm_call))
+        assert granted == ["high", "high", "low", "low"]
+        assert scheduler.stats["max_in_flight_seen"] == 1
+        assert limiter.in_flight == 0
@@ -0,0 +1,98 @@
+import sys
+import os
+import asyncio
+
+# Add repository root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthesis import TreeSynthesizer
+
+
+class RecordingMerge:
+    """Merge function stub recording every call; merged text lists its inputs"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, texts, final, on_token=None):
+        await asyncio.sleep(0)
+        merged = "(" + "+".join(texts) + ")"
+        self.calls.append((list(texts), final))
+        if final and on_token is not None:
+            on_token(merged)
+        return merged
+
+
+def run_tree(expected, responses, fan_in=2):
+    """Feed responses one by one, letting background merges run in between, then finish"""
+    merge = RecordingMerge()
+    tokens = []
+
+    async def scenario():
+        synthesizer = TreeSynthesizer(merge, expected, fan_in=fan_in)
+        for response in responses:
+            synthesizer.add(response)
+            for _ in range(5):
+                await asyncio.sleep(0)
+        return synthesizer, await synthesizer.finish(on_token=tokens.append)
+
+    synthesizer, answer = asyncio.run(scenario())
+    return synthesizer, answer, merge.calls, tokens
+
+
+class TestTreeSynthesizer:
+    """Test TreeSynthesizer merge shape and final merge"""
+
+    def test_merges_form_balanced_tree(self):
+        """Eight responses merge pairwise per level, not as a chain"""
+        synthesizer, answer, calls, _ = run_tree(8, [f"r{i}" for i in range(8)])
+
+        assert sorted(texts for texts, final in calls if not final) == sorted([
+            ["r0", "r1"], ["r2", "r3"], ["(r0+r1)", "(r2+r3)"],
+            ["r4", "r5"], ["r6", "r7"], ["(r4+r5)", "(r6+r7)"]
+        ])
+        assert calls[-1] == (["((r0+r1)+(r2+r3))", "((r4+r5)+(r6+r7))"], True)
+        assert answer == "(((r0+r1)+(r2+r3))+((r4+r5)+(r6+r7)))"
+        assert synthesizer.stats["depth"] == 2
+
+    def test_quorum_cut_runs_final_merge(self):
+        """Expected 8 but only 4 responses arrive: the lone partial still gets the final merge"""
+        synthesizer, answer, calls, tokens = run_tree(8, ["r0", "r1", "r2", "r3"])
+
+        assert [texts for texts, final in calls if not final] == [
+            ["r0", "r1"], ["r2", "r3"], ["(r0+r1)", "(r2+r3)"]
+        ]
+        assert calls[-1] == (["((r0+r1)+(r2+r3))"], True)
+        assert answer == "(((r0+r1)+(r2+r3)))"
+        assert tokens == [answer]
+        assert synthesizer.stats["final_merge_inputs"] == 1
+
+    def test_failed_agents_leave_single_response(self):
+        """Failed agents add None; the one surviving response goes through the final merge"""
+        synthesizer, answer, calls, tokens = run_tree(4, [None, "r1", None, None])
+
+        assert calls == [(["r1"], True)]
+        assert answer == "(r1)"
+        assert tokens == [answer]
+
+    def test_all_agents_failed(self):
+        """No usable response: no merge at all"""
+        synthesizer, answer, calls, _ = run_tree(3, [None, None, None])
+
+        assert answer is None
+        assert calls == []
+
+    def test_leftovers_reduced_level_by_level(self):
+        """Responses arriving together are reduced to at most fan_in final inputs"""
+        merge = RecordingMerge()
+
+        async def scenario():
+            synthesizer = TreeSynthesizer(merge, 5, fan_in=2)
+            for i in range(5):
+                synthesizer.add(f"r{i}")
+            return synthesizer, await synthesizer.finish()
+
+        synthesizer, answer = asyncio.run(scenario())
+        assert synthesizer.stats["final_merge_inputs"] <= 2
+        for i in range(5):
+            assert f"r{i}" in answer
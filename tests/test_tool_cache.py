@@ -0,0 +1,90 @@
+import sys
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Add repository root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool_cache import ToolResultCache
+from tools.base_tool import BaseTool
+
+
+class LookupTool(BaseTool):
+    """Read-only stub tool"""
+    cacheable = True
+    name = "lookup"
+    description = "Look something up"
+    parameters = {"type": "object", "properties": {"query": {"type": "string"}}}
+
+    def execute(self, query):
+        return {"answer": query}
+
+
+class WriteTool(LookupTool):
+    cacheable = False
+    name = "write"
+
+
+def finished(result=None, exception=None):
+    """A completed executor future"""
+    future = Future()
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+    return future
+
+
+class TestToolResultCache:
+    """Test ToolResultCache sharing of tool executions"""
+
+    def setup_method(self):
+        self.cache = ToolResultCache({"lookup": LookupTool(), "write": WriteTool()})
+
+    def test_only_cacheable_tools(self):
+        assert self.cache.cacheable("lookup")
+        assert not self.cache.cacheable("write")
+        assert not self.cache.cacheable("unknown")
+
+    def test_concurrent_identical_calls_run_once(self):
+        """Calls arriving while the first runs wait on it; whitespace and key order don't matter"""
+        release = threading.Event()
+        executions = []
+
+        def slow_lookup():
+            executions.append(1)
+            release.wait(5)
+            return {"answer": "Paris"}
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            def execute():
+                return executor.submit(slow_lookup)
+
+            futures = [
+                self.cache.submit("lookup", {"query": "capital  of France"}, execute),
+                self.cache.submit("lookup", {"query": " capital of France "}, execute),
+                self.cache.submit("lookup", {"query": "capital of France"}, execute)
+            ]
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        assert results == [{"answer": "Paris"}] * 3
+        assert len(executions) == 1
+        assert self.cache.stats == {"calls": 3, "hits": 0, "dedups": 2, "executions": 1}
+
+        # A later identical call reuses the finished result
+        self.cache.submit("lookup", {"query": "capital of France"}, lambda: finished({"answer": "stale"}))
+        assert self.cache.stats["hits"] == 1
+
+    def test_failed_results_are_not_kept(self):
+        """Exceptions and error payloads are retried by the next identical call"""
+        future = self.cache.submit("lookup", {"query": "a"}, lambda: finished(exception=RuntimeError("down")))
+        assert isinstance(future.exception(), RuntimeError)
+        future = self.cache.submit("lookup", {"query": "a"}, lambda: finished({"error": "rate limited"}))
+        assert future.result() == {"error": "rate limited"}
+        self.cache.submit("lookup", {"query": "a"}, lambda: finished([{"error": "timeout"}]))
+        future = self.cache.submit("lookup", {"query": "a"}, lambda: finished({"answer": "ok"}))
+        assert future.result() == {"answer": "ok"}
+        assert self.cache.submit("lookup", {"query": "a"}, lambda: finished({"answer": "new"})).result() == {"answer": "ok"}
+        assert self.cache.stats["executions"] == 4
@@ -0,0 +1,51 @@
+import sys
+import os
+import json
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+# Add repository root to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent import AsyncOpenRouterAgent
+from runtime import AgentRuntime
+
+
+def tool_call(index, name, args):
+    return SimpleNamespace(id=f"call_{index}", function=SimpleNamespace(name=name, arguments=json.dumps(args)))
+
+
+class TestToolLimits:
+    """Test the per-tool concurrency limit across iteration deadlines"""
+
+    def test_timed_out_calls_keep_their_slots(self):
+        """Calls abandoned at the deadline hold their tool slot until their thread finishes"""
+        runtime = AgentRuntime(os.path.join(ROOT, "config.yaml"))
+        runtime.tool_concurrency = {"search_web": 2, "default": 16}
+        agent = AsyncOpenRouterAgent(silent=True, runtime=runtime)
+        running, peak, lock = [0], [0], threading.Lock()
+
+        def slow_search(**kwargs):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.3)
+            with lock:
+                running[0] -= 1
+            return "results"
+
+        agent.tool_mapping["search_web"] = slow_search
+
+        async def scenario():
+            for turn in range(3):
+                calls = [tool_call(i, "search_web", {"query": f"q{turn}-{i}"}) for i in range(4)]
+                results = await agent.handle_tool_calls(calls, timeout=0.05)
+                assert all("deadline" in result["content"] for result in results)
+            await asyncio.sleep(2)
+
+        asyncio.run(scenario())
+        runtime.tool_executor.shutdown()
+        assert peak[0] == 2
@@ -0,0 +1,59 @@
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+
+def is_error_result(result: Any) -> bool:
+    """Whether a tool returned an error payload ({"error": ...} or [{"error": ...}])"""
+    if isinstance(result, list) and len(result) == 1:
+        result = result[0]
+    return isinstance(result, dict) and "error" in result
+
+
+class ToolResultCache:
+    """
+    Tool results shared by the agents of one orchestration, with single-flight semantics.
+
+    Calls to cacheable tools are keyed by tool name and normalized arguments. A call
+    identical to one already running waits for that execution instead of starting its
+    own; a call identical to a finished one reuses its result. Failed executions are
+    shared with the callers that waited on them but are not kept for later calls.
+
+    Entries are concurrent.futures.Future objects from the tool executor, so the cache
+    works across threads and event loops.
+    """
+
+    def __init__(self, tools: Dict[str, Any]):
+        self.tools = tools
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "hits": 0, "dedups": 0, "executions": 0}
+
+    def cacheable(self, tool_name: str) -> bool:
+        tool = self.tools.get(tool_name)
+        return tool is not None and tool.cacheable
+
+    def key(self, tool_name: str, tool_args: dict) -> str:
+        normalized = self.tools[tool_name].normalize_args(tool_args)
+        return json.dumps([tool_name, normalized], sort_keys=True, default=str)
+
+    def submit(self, tool_name: str, tool_args: dict, execute: Callable[[], Future]) -> Future:
+        """Return the future of an identical call, or start one with execute()"""
+        key = self.key(tool_name, tool_args)
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._futures.get(key)
+            if future is not None and not self._failed(future):
+                self.stats["hits" if future.done() else "dedups"] += 1
+                return future
+            future = execute()
+            self._futures[key] = future
+            self.stats["executions"] += 1
+            return future
+
+    @staticmethod
+    def _failed(future: Future) -> bool:
+        if not future.done():
+            return False
+        return future.cancelled() or future.exception() is not None or is_error_result(future.result())
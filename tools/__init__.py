@@ -10,9 +10,9 @@ def discover_tools(config: dict = None, silent: bool = False) -> Dict[str, BaseT
     # Get the tools directory path
     tools_dir = os.path.dirname(__file__)
     
-    # Scan for Python files (excluding __init__.py and base_tool.py)
-    for filename in os.listdir(tools_dir):
-        if filename.endswith('.py') and filename not in ['__init__.py', 'base_tool.py']:
+    # Scan for Python files (excluding base_tool.py and _private helper modules) in a fixed order
+    for filename in sorted(os.listdir(tools_dir)):
+        if filename.endswith('.py') and not filename.startswith('_') and filename != 'base_tool.py':
             module_name = filename[:-3]  # Remove .py extension
             
             try:
@@ -36,4 +36,5 @@ def discover_tools(config: dict = None, silent: bool = False) -> Dict[str, BaseT
                 if not silent:
                     print(f"Warning: Could not load tool from {filename}: {e}")
     
-    return tools
\ No newline at end of file
+    # Order tools by name so the schema array sent to the model is identical across runs
+    return dict(sorted(tools.items()))
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""
+HTML to visible text extractors for fetched pages.
+
+Every extractor takes decoded text chunks through feed() as they arrive from the
+network and exposes the text extracted so far, so callers can stop reading a page
+once they have enough. Script and style contents are dropped and whitespace is
+collapsed, as BeautifulSoup's get_text() with ' '.join(text.split()) did.
+
+    lxml         libxml2's C parser driving a callback target (fastest; needs lxml)
+    html.parser  the standard library's tokenizer
+    bs4          BeautifulSoup tree, parsed once the body is complete (reference and fallback)
+"""
+
+from html.parser import HTMLParser
+
+SKIPPED_TAGS = ("script", "style")
+
+
+def collapse(parts) -> str:
+    return ' '.join(''.join(parts).split())
+
+
+class StdlibExtractor(HTMLParser):
+    """Tokenizer-based streaming extractor on html.parser"""
+
+    streaming = True
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+    @property
+    def text(self) -> str:
+        return collapse(self.parts)
+
+
+class _TextTarget:
+    """lxml parser target collecting text outside script and style"""
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.skip_depth = 0
+
+    def start(self, tag, attrib):
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+
+    def end(self, tag):
+        if tag in SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+    def close(self):
+        pass
+
+
+class LxmlExtractor:
+    """Streaming extractor on lxml's C HTML parser; only the text callbacks run in Python"""
+
+    streaming = True
+
+    def __init__(self):
+        from lxml import etree
+        self.parts = []
+        self.parser = etree.HTMLParser(target=_TextTarget(self.parts))
+
+    def feed(self, data: str):
+        if data:
+            self.parser.feed(data)
+
+    def close(self):
+        try:
+            self.parser.close()
+        except Exception:
+            # Nothing was fed (empty body)
+            pass
+
+    @property
+    def text(self) -> str:
+        return collapse(self.parts)
+
+
+class BeautifulSoupExtractor:
+    """The original full-tree path: buffers the body and parses it with BeautifulSoup"""
+
+    streaming = False
+
+    def __init__(self):
+        self.chunks = []
+        self._text = None
+
+    def feed(self, data: str):
+        self.chunks.append(data)
+        self._text = None
+
+    def close(self):
+        pass
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(''.join(self.chunks), 'html.parser')
+            for element in soup(list(SKIPPED_TAGS)):
+                element.decompose()
+            self._text = ' '.join(soup.get_text().split())
+        return self._text
+
+
+class PlainTextExtractor:
+    """Payloads that are already text (text/plain, JSON)"""
+
+    streaming = True
+
+    def __init__(self):
+        self.parts = []
+
+    def feed(self, data: str):
+        self.parts.append(data)
+
+    def close(self):
+        pass
+
+    @property
+    def text(self) -> str:
+        return collapse(self.parts)
+
+
+EXTRACTORS = {
+    "lxml": LxmlExtractor,
+    "html.parser": StdlibExtractor,
+    "bs4": BeautifulSoupExtractor
+}
+
+
+def html_extractor(name: str = "auto"):
+    """Extractor class by name; auto picks lxml when it is installed, else html.parser"""
+    if name == "auto":
+        try:
+            import lxml.etree  # noqa: F401
+            return LxmlExtractor
+        except ImportError:
+            return StdlibExtractor
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown HTML extractor: {name} (choose from auto, {', '.join(EXTRACTORS)})")
+    return EXTRACTORS[name]
@@ -0,0 +1,78 @@
+"""
+Persistent cache of fetched pages' extracted text for the search tool.
+
+Entries are keyed by normalised URL and keep the page's ETag / Last-Modified. Within
+the TTL a hit needs no network at all; after it the page is revalidated with a
+conditional request, and a 304 renews the entry without downloading the body. The
+SQLite file is capped at max_bytes, evicting least recently used pages first.
+"""
+
+import time
+import threading
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from sqlite_lru import SQLiteLRU
+
+# Query parameters that only track the visitor and never change the page
+TRACKING_PARAMS = ("utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content", "fbclid", "gclid", "ref")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: lower-case scheme and host, no default port, fragment or tracking params, sorted query"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS
+    ))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+class PageCache:
+    """SQLite-backed page text cache with conditional revalidation and LRU eviction by bytes"""
+
+    def __init__(self, path: str = ".cache/page_cache.sqlite", ttl: float = 86400, max_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._store = SQLiteLRU(path, "pages", {
+            "text": "TEXT NOT NULL", "etag": "TEXT", "last_modified": "TEXT", "validated_at": "REAL NOT NULL"
+        }, max_bytes)
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        The cached entry for a URL, or None. `fresh` tells whether it is within the TTL;
+        stale entries are still returned so their validators can be sent.
+        """
+        row = self._store.get(normalize_url(url))
+        with self._lock:
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            fresh = time.time() - row["validated_at"] <= self.ttl
+            if fresh:
+                self.stats["hits"] += 1
+        return {"text": row["text"], "etag": row["etag"], "last_modified": row["last_modified"], "fresh": fresh}
+
+    def put(self, url: str, text: str, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Store a freshly downloaded page"""
+        evicted = self._store.put(
+            normalize_url(url), len(text.encode("utf-8")),
+            text=text, etag=etag, last_modified=last_modified, validated_at=time.time()
+        )
+        with self._lock:
+            self.stats["writes"] += 1
+            self.stats["evictions"] += len(evicted)
+
+    def revalidated(self, url: str):
+        """The server answered 304 Not Modified: the entry is fresh for another TTL"""
+        self._store.update(normalize_url(url), validated_at=time.time())
+        with self._lock:
+            self.stats["revalidated"] += 1
@@ -1,9 +1,55 @@
+import threading
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from concurrent.futures import Future
+from typing import Dict, Any, List, Callable
+
+def canonicalize(value: Any) -> Any:
+    """Recursively sort dict keys so the value always serializes to the same JSON"""
+    if isinstance(value, dict):
+        return {key: canonicalize(value[key]) for key in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        return [canonicalize(item) for item in value]
+    return value
+
+class SingleFlight:
+    """Collapse concurrent identical blocking calls (same key) onto one execution"""
+    
+    def __init__(self):
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.stats = {"executions": 0, "dedups": 0}
+    
+    def do(self, key: Any, fn: Callable[[], Any]) -> Any:
+        """Run fn, or wait for the identical call already running and share its outcome"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self.stats["executions"] += 1
+            else:
+                self.stats["dedups"] += 1
+        if not owner:
+            return future.result()
+        
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
 
 class BaseTool(ABC):
     """Base class for all tools"""
     
+    # Read-only tools whose results may be shared between the agents of one orchestration
+    cacheable = False
+    
     @property
     @abstractmethod
     def name(self) -> str:
@@ -27,13 +73,20 @@ class BaseTool(ABC):
         """Execute the tool with given parameters"""
         pass
     
+    def normalize_args(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Canonical form of call arguments, used to recognise identical calls"""
+        return canonicalize({
+            key: " ".join(value.split()) if isinstance(value, str) else value
+            for key, value in args.items()
+        })
+    
     def to_openrouter_schema(self) -> Dict[str, Any]:
-        """Convert tool to OpenRouter function schema"""
-        return {
+        """Convert tool to OpenRouter function schema (canonical key order for prompt caching)"""
+        return canonicalize({
             "type": "function",
             "function": {
                 "name": self.name,
                 "description": self.description,
                 "parameters": self.parameters
             }
-        }
\ No newline at end of file
+        })
\ No newline at end of file
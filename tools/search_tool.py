@@ -1,12 +1,65 @@
-from .base_tool import BaseTool
+from .base_tool import BaseTool, SingleFlight
+from ._html_extract import PlainTextExtractor, html_extractor
+from ._page_cache import PageCache, normalize_url
 from ddgs import DDGS
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, wait
+import threading
 import requests
+import codecs
 import json
+import re
+
+# Content types read as a page; HTML is reduced to its visible text, the rest is used as is
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+TEXT_TYPES = ("text/plain", "application/json", "text/markdown")
 
 class SearchTool(BaseTool):
+    cacheable = True
+    
     def __init__(self, config: dict):
         self.config = config
+        search_config = config.get('search', {})
+        self.fetch_deadline = search_config.get('fetch_deadline', 8)
+        self.fetch_timeout = search_config.get('fetch_timeout', 10)
+        
+        # Page bodies are streamed: reading stops at max_page_bytes or once content_chars of text are extracted
+        self.max_page_bytes = search_config.get('max_page_bytes', 1048576)
+        self.content_chars = search_config.get('content_chars', 1000)
+        self.extractor_class = html_extractor(search_config.get('html_extractor', 'auto'))
+        self.stats = {"pages": 0, "skipped": 0, "bytes_downloaded": 0, "bytes_used": 0, "cache_hits": 0, "revalidated": 0}
+        self._stats_lock = threading.Lock()
+        
+        # Agents searching in parallel often hit the same pages; fetch each URL once at a time
+        self.page_fetches = SingleFlight()
+        
+        # Keep-alive connection pool shared by every search; pool_block caps connections per host
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = search_config.get('user_agent', 'Mozilla/5.0')
+        adapter = HTTPAdapter(
+            pool_connections=search_config.get('pooled_hosts', 64),
+            pool_maxsize=search_config.get('max_connections_per_host', 4),
+            pool_block=True
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Result pages of a search are downloaded concurrently on these threads
+        self.fetch_executor = ThreadPoolExecutor(
+            max_workers=search_config.get('fetch_workers', 16),
+            thread_name_prefix="page-fetch"
+        )
+        
+        # Extracted page text persisted across runs, revalidated after its TTL
+        cache_config = search_config.get('page_cache', {})
+        self.page_cache = PageCache(
+            cache_config.get('path', '.cache/page_cache.sqlite'),
+            ttl=cache_config.get('ttl', 86400),
+            max_bytes=cache_config.get('max_bytes', 64 * 1024 * 1024)
+        ) if cache_config.get('enabled', True) else None
+        
+        # One DDGS client per tool thread, reused across searches
+        self._local = threading.local()
     
     @property
     def name(self) -> str:
@@ -34,55 +87,125 @@ class SearchTool(BaseTool):
             "required": ["query"]
         }
     
+    def normalize_args(self, args: dict) -> dict:
+        """Search queries are case-insensitive; fill in the default result count"""
+        args = super().normalize_args(args)
+        if isinstance(args.get("query"), str):
+            args["query"] = args["query"].lower()
+        args.setdefault("max_results", 5)
+        return args
+    
+    @property
+    def ddgs(self) -> DDGS:
+        if not hasattr(self._local, 'ddgs'):
+            self._local.ddgs = DDGS()
+        return self._local.ddgs
+    
+    def fetch_page_text(self, url: str) -> str:
+        """Visible text of a page: from the page cache, revalidated, or downloaded"""
+        cached = self.page_cache.get(url) if self.page_cache is not None else None
+        if cached is not None and cached["fresh"]:
+            with self._stats_lock:
+                self.stats["cache_hits"] += 1
+            return cached["text"]
+        
+        # A stale entry is revalidated: 304 Not Modified means its text can be reused
+        headers = {}
+        if cached is not None and cached["etag"]:
+            headers['If-None-Match'] = cached["etag"]
+        if cached is not None and cached["last_modified"]:
+            headers['If-Modified-Since'] = cached["last_modified"]
+        
+        with self.session.get(url, headers=headers, timeout=self.fetch_timeout, stream=True) as response:
+            if response.status_code == 304 and cached is not None:
+                self.page_cache.revalidated(url)
+                with self._stats_lock:
+                    self.stats["revalidated"] += 1
+                return cached["text"]
+            text = self.read_page_text(response)
+        
+        if self.page_cache is not None:
+            self.page_cache.put(url, text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return text
+    
+    def read_page_text(self, response) -> str:
+        """Stream a response body into visible text (content_chars at most), reading no more of it than needed"""
+        response.raise_for_status()
+        
+        # Decide from the headers whether the body is worth reading at all
+        content_type, _, params = response.headers.get('Content-Type', 'text/html').partition(';')
+        content_type = content_type.strip().lower()
+        if content_type in HTML_TYPES:
+            extractor = self.extractor_class()
+        elif content_type in TEXT_TYPES:
+            extractor = PlainTextExtractor()
+        else:
+            with self._stats_lock:
+                self.stats["skipped"] += 1
+            return f"[{content_type} content not read]"
+        
+        charset = re.search(r'charset=["\']?([\w.:-]+)', params)
+        try:
+            decoder = codecs.getincrementaldecoder(charset.group(1) if charset else 'utf-8')(errors='replace')
+        except LookupError:
+            decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        # Feed chunks to the extractor until it has enough text or the byte cap is reached;
+        # closing the response then drops the connection with the unread rest of the body
+        downloaded = 0
+        for chunk in response.iter_content(chunk_size=min(16384, self.max_page_bytes)):
+            downloaded += len(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if downloaded >= self.max_page_bytes or (extractor.streaming and len(extractor.text) >= self.content_chars):
+                break
+        else:
+            extractor.feed(decoder.decode(b'', final=True))
+        extractor.close()
+        
+        with self._stats_lock:
+            self.stats["pages"] += 1
+            self.stats["bytes_downloaded"] += downloaded
+            self.stats["bytes_used"] += len(extractor.text[:self.content_chars].encode('utf-8'))
+        
+        # Limit content length
+        text = extractor.text
+        return text[:self.content_chars] + "..." if len(text) > self.content_chars else text
+    
+    def fetch_shared(self, url: str) -> str:
+        """Fetch a page, sharing downloads of the same URL already in progress"""
+        return self.page_fetches.do(normalize_url(url), lambda: self.fetch_page_text(url))
+    
     def execute(self, query: str, max_results: int = 5) -> list:
         """Search the web using DuckDuckGo and fetch page content"""
         try:
             # Use ddgs library
-            ddgs = DDGS()
-            results = ddgs.text(query, max_results=max_results)
+            results = self.ddgs.text(query, max_results=max_results)
+            
+            # Fetch all result pages at once; whatever misses the deadline keeps just its snippet
+            fetches = [self.fetch_executor.submit(self.fetch_shared, result['href']) for result in results]
+            wait(fetches, timeout=self.fetch_deadline)
             
             simplified_results = []
             
-            for result in results:
+            for result, fetch in zip(results, fetches):
+                entry = {
+                    "title": result['title'],
+                    "url": result['href'],
+                    "snippet": result['body']
+                }
+                if not fetch.done():
+                    # Missed the deadline; the download finishes in the background
+                    simplified_results.append(entry)
+                    continue
+                
                 try:
-                    # Fetch content with requests
-                    response = requests.get(
-                        result['href'], 
-                        headers={'User-Agent': self.config.get('search', {}).get('user_agent', 'Mozilla/5.0')},
-                        timeout=10
-                    )
-                    response.raise_for_status()
-                    
-                    # Parse HTML with BeautifulSoup
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Remove script and style elements
-                    for script in soup(["script", "style"]):
-                        script.decompose()
-                    
-                    # Get text content
-                    text = soup.get_text()
-                    # Clean up whitespace
-                    text = ' '.join(text.split())
-                    
-                    # Limit content length
-                    content_snippet = text[:1000] + "..." if len(text) > 1000 else text
-                    
-                    simplified_results.append({
-                        "title": result['title'],
-                        "url": result['href'],
-                        "snippet": result['body'],
-                        "content": content_snippet
-                    })
+                    entry["content"] = fetch.result()
                 
                 except Exception as e:
                     # If we can't fetch the page, still include the search result
-                    simplified_results.append({
-                        "title": result['title'],
-                        "url": result['href'],
-                        "snippet": result['body'],
-                        "content": f"Could not fetch content: {str(e)}"
-                    })
+                    entry["content"] = f"Could not fetch content: {str(e)}"
+                
+                simplified_results.append(entry)
             
             return simplified_results
         
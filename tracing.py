@@ -0,0 +1,118 @@
+import os
+import json
+import time
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Innermost open span of the current task, used to link parents and inherit agent_id
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation with its attributes"""
+
+    def __init__(self, span_id: int, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.span_id = span_id
+        self.name = name
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        if "agent_id" not in attrs and parent is not None and "agent_id" in parent.attrs:
+            self.attrs["agent_id"] = parent.attrs["agent_id"]
+        self.start = time.time()
+        self.end = None
+
+    def set(self, **attrs):
+        """Add attributes, e.g. token usage or result size once known"""
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "end": self.end,
+            "duration": (self.end or self.start) - self.start,
+            "attrs": self.attrs
+        }
+
+
+class Tracer:
+    """
+    Records spans for LLM calls, tool calls and orchestration phases.
+    Exports to JSONL (one span per line) and Chrome trace-event format
+    (load in chrome://tracing or Perfetto; one lane per agent).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.spans: List[Span] = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time the enclosed block as a span; works in both sync and async code"""
+        parent = _current_span.get()
+        span = Span(next(self._ids), name, parent, attrs)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.end = time.time()
+            _current_span.reset(token)
+            if self.enabled:
+                with self._lock:
+                    self.spans.append(span)
+
+    def export_jsonl(self, path: str):
+        """Write one JSON object per span, ordered by start time"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for span in sorted(self.spans, key=lambda s: s.start):
+                f.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+    def export_chrome(self, path: str):
+        """Write Chrome trace-event JSON with one timeline lane per agent"""
+        origin = min((span.start for span in self.spans), default=time.time())
+        events = []
+        lanes = {}
+        for span in sorted(self.spans, key=lambda s: s.start):
+            agent_id = span.attrs.get("agent_id")
+            tid = 0 if agent_id is None else agent_id + 1
+            lanes[tid] = "orchestrator" if agent_id is None else f"agent {agent_id + 1}"
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": (span.start - origin) * 1e6,
+                "dur": ((span.end or span.start) - span.start) * 1e6,
+                "pid": 1,
+                "tid": tid,
+                "args": span.attrs
+            })
+        for tid, lane_name in lanes.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": lane_name}})
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, default=str)
+
+    def export(self, output_dir: str, run_name: str) -> Dict[str, str]:
+        """Write both formats into output_dir and return their paths"""
+        os.makedirs(output_dir, exist_ok=True)
+        paths = {
+            "jsonl": os.path.join(output_dir, f"{run_name}.jsonl"),
+            "chrome": os.path.join(output_dir, f"{run_name}.trace.json")
+        }
+        self.export_jsonl(paths["jsonl"])
+        self.export_chrome(paths["chrome"])
+        return paths
+
+
+# Disabled tracer used by agents created outside an orchestration
+NULL_TRACER = Tracer(enabled=False)
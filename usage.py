@@ -0,0 +1,102 @@
+import threading
+from typing import Any, Dict, Optional
+
+USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "reasoning_tokens", "cached_tokens", "cost")
+
+
+def empty_usage() -> Dict[str, Any]:
+    return {"prompt_tokens": 0, "completion_tokens": 0, "reasoning_tokens": 0, "cached_tokens": 0, "cost": 0.0}
+
+
+def add_usage(total: Dict[str, Any], usage: Dict[str, Any]):
+    """Add one usage record into a running total, in place"""
+    for field in USAGE_FIELDS:
+        total[field] = total.get(field, 0) + (usage.get(field) or 0)
+
+
+def response_usage(response, pricing: Optional[dict] = None) -> Optional[Dict[str, Any]]:
+    """
+    Read token usage and cost from a chat completion; None if the response has no usage.
+    Cost is what OpenRouter reports, else estimated from pricing (USD per million tokens).
+    """
+    usage = response.usage
+    if usage is None:
+        return None
+    prompt_details = getattr(usage, "prompt_tokens_details", None)
+    completion_details = getattr(usage, "completion_tokens_details", None)
+    record = {
+        "prompt_tokens": usage.prompt_tokens or 0,
+        "completion_tokens": usage.completion_tokens or 0,
+        "reasoning_tokens": getattr(completion_details, "reasoning_tokens", None) or 0,
+        "cached_tokens": getattr(prompt_details, "cached_tokens", None) or 0,
+        "cost": getattr(usage, "cost", None)
+    }
+    if record["cost"] is None:
+        pricing = pricing or {}
+        record["cost"] = (record["prompt_tokens"] * pricing.get("prompt", 0)
+                          + record["completion_tokens"] * pricing.get("completion", 0)) / 1e6
+    return record
+
+
+def phase_order(phase: str):
+    """Sort key listing phases in run order: decomposition, agents by id, merges, synthesis"""
+    name, _, index = phase.partition("_")
+    rank = {"decomposition": 0, "agent": 1, "merge": 2, "synthesis": 3}.get(name, 4)
+    return rank, int(index) if index.isdigit() else 0, phase
+
+
+class UsageLedger:
+    """
+    Token and cost accounting for one orchestration, per phase (decomposition, agent_<i>,
+    merge, synthesis), with an optional run-wide budget.
+
+    Once `degrade_at` of the budget is used, agents are told to wrap up; once it is all
+    used, agents stop and no new ones start. Synthesis still runs so the run has an answer.
+    """
+
+    def __init__(self, max_tokens: Optional[int] = None, max_cost: Optional[float] = None, degrade_at: float = 0.8):
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.degrade_at = degrade_at
+        self.phases = {}
+        self.total = {**empty_usage(), "calls": 0}
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, usage: Optional[Dict[str, Any]]):
+        if not usage:
+            return
+        with self._lock:
+            entry = self.phases.setdefault(phase, {**empty_usage(), "calls": 0})
+            for totals in (entry, self.total):
+                add_usage(totals, usage)
+                totals["calls"] += usage.get("calls", 1)
+
+    def fraction_used(self) -> float:
+        """Largest used share of the token or cost budget (0 without a budget)"""
+        fractions = [0.0]
+        if self.max_tokens:
+            fractions.append((self.total["prompt_tokens"] + self.total["completion_tokens"]) / self.max_tokens)
+        if self.max_cost:
+            fractions.append(self.total["cost"] / self.max_cost)
+        return max(fractions)
+
+    def degraded(self) -> bool:
+        return self.fraction_used() >= self.degrade_at
+
+    def exhausted(self) -> bool:
+        return self.fraction_used() >= 1.0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "total": dict(self.total),
+                "phases": {phase: dict(self.phases[phase]) for phase in sorted(self.phases, key=phase_order)},
+                "budget": {
+                    "max_tokens": self.max_tokens,
+                    "max_cost": self.max_cost,
+                    "fraction_used": self.fraction_used(),
+                    "degraded": self.degraded(),
+                    "exhausted": self.exhausted()
+                }
+            }
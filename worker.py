@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Agent worker for the queue execution backend.
+
+Claims agent jobs from the shared queue, runs each with a local agent and writes the
+result back for the orchestrator. Start as many workers as needed on the machine that
+holds the queue file (a local disk; SQLite locking is unreliable on network filesystems):
+
+    python worker.py .cache/agent_queue.sqlite [config.yaml]
+"""
+
+import os
+import sys
+import socket
+import asyncio
+from backends import TaskQueue, run_agent_standalone
+
+
+async def serve(queue: TaskQueue, config_path: str, concurrency: int, poll_interval: float):
+    """Keep up to `concurrency` agents running, claiming new jobs as slots free up"""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    running = set()
+
+    async def execute(job_id, payload):
+        try:
+            result = await run_agent_standalone(config_path, payload["subtask"])
+            queue.finish(job_id, result)
+        except Exception as e:
+            queue.finish(job_id, {"error": str(e)}, failed=True)
+
+    while True:
+        while len(running) < concurrency:
+            job = queue.claim(worker_id)
+            if job is None:
+                break
+            running.add(asyncio.ensure_future(execute(*job)))
+        if running:
+            _, running = await asyncio.wait(running, timeout=poll_interval, return_when=asyncio.FIRST_COMPLETED)
+        else:
+            await asyncio.sleep(poll_interval)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    config_path = sys.argv[2] if len(sys.argv) > 2 else "config.yaml"
+
+    from runtime import get_runtime
+    runtime = get_runtime(config_path)
+    backend_config = runtime.config.get('backend', {})
+    # Every worker takes an equal share of the rate limits
+    runtime.rate_limiter.split(backend_config.get('workers') or backend_config.get('spawn_workers') or 1)
+    queue = TaskQueue(sys.argv[1], backend_config.get('lease_seconds', 600))
+    try:
+        asyncio.run(serve(queue, config_path,
+                          backend_config.get('worker_concurrency', 4),
+                          backend_config.get('poll_interval', 0.2)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()